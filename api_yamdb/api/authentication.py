@@ -0,0 +1,153 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from reviews.models import User
+
+TOKEN_VERSION_KEY = 'auth:token_version:{}'
+# Клеймы прав, которые create_token добавляет в access-токен.
+RIGHTS_CLAIMS = ('username', 'role', 'is_staff', 'is_superuser')
+VERSION_CLAIM = 'token_version'
+
+
+class UserCache:
+    """
+    Ограниченный LRU-кэш пользователей с временем жизни записи.
+    Живёт в памяти процесса: сохранение пользователя сбрасывает запись
+    сигналом, а в других процессах она устаревает не позже чем
+    через timeout секунд.
+    """
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.items = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            item = self.items.get(key)
+            if item is None:
+                return None
+            expires, user = item
+            if expires < time.monotonic():
+                del self.items[key]
+                return None
+            self.items.move_to_end(key)
+            return user
+
+    def set(self, key, user):
+        with self.lock:
+            self.items[key] = (time.monotonic() + self.timeout, user)
+            self.items.move_to_end(key)
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def invalidate(self, key=None):
+        with self.lock:
+            if key is None:
+                self.items.clear()
+            else:
+                self.items.pop(key, None)
+
+
+user_cache = UserCache(
+    settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TIMEOUT
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication, который берёт пользователя из user_cache
+    и обращается к таблице пользователей только при промахе.
+    Каждый запрос получает свою копию объекта.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = user_cache.get(user_id) if user_id is not None else None
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        return copy.copy(user)
+
+
+def get_token_version(user_id):
+    """
+    Текущая token_version пользователя из кэша. Промах - один запрос
+    к базе; сигналы сохранения и удаления пользователя обновляют
+    и удаляют значение. None, если пользователя нет.
+    С кэшем в памяти процесса другие процессы видят смену прав не
+    позже чем через AUTH_TOKEN_VERSION_TIMEOUT секунд.
+    """
+    key = TOKEN_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.filter(pk=user_id).values_list(
+            'token_version', flat=True
+        ).first()
+        if version is not None:
+            cache.set(key, version, settings.AUTH_TOKEN_VERSION_TIMEOUT)
+    return version
+
+
+def set_token_version(user):
+    cache.set(
+        TOKEN_VERSION_KEY.format(user.pk),
+        user.token_version,
+        settings.AUTH_TOKEN_VERSION_TIMEOUT
+    )
+
+
+def forget_token_version(user_id):
+    cache.delete(TOKEN_VERSION_KEY.format(user_id))
+
+
+def token_user(validated_token):
+    """
+    Несохранённый пользователь из клеймов токена: хватает для проверки
+    прав и подстановки автора, остальные поля пустые. Такой объект
+    нельзя сохранять и выводить целиком - см. UserViewSet.me_get_patch.
+    """
+    return User(
+        id=validated_token[api_settings.USER_ID_CLAIM],
+        is_active=True,
+        **{name: validated_token[name] for name in RIGHTS_CLAIMS}
+    )
+
+
+class TokenClaimsAuthentication(CachedJWTAuthentication):
+    """
+    Если в токене есть клеймы прав и его token_version совпадает
+    с текущей, пользователь собирается из токена без обращения
+    к таблице пользователей. Если версия устарела - пользователь
+    читается из базы в обход user_cache, поэтому смена роли сразу
+    отзывает права старых токенов. Удалённый пользователь
+    не проходит аутентификацию.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or not all(
+            name in validated_token for name in RIGHTS_CLAIMS
+        ):
+            return super().get_user(validated_token)
+        version = get_token_version(user_id)
+        if version is None:
+            user_cache.invalidate(user_id)
+            raise AuthenticationFailed(
+                _('User not found'), code='user_not_found'
+            )
+        if validated_token.get(VERSION_CLAIM) == version:
+            return token_user(validated_token)
+        user = JWTAuthentication.get_user(self, validated_token)
+        user_cache.set(user_id, user)
+        return copy.copy(user)
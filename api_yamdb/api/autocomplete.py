@@ -0,0 +1,137 @@
+import heapq
+import threading
+from bisect import bisect_left, insort
+
+from reviews.models import Category, Genre, Title
+
+from .cache import CATALOG, VersionWatcher
+
+KINDS = ('title', 'genre', 'category')
+# Вид -> модель и поле, которое выводится в ответе.
+SOURCES = {
+    'title': (Title, 'id'),
+    'genre': (Genre, 'slug'),
+    'category': (Category, 'slug'),
+}
+
+
+def make_entries(name, key):
+    """ Ключи поиска: название начиная с каждого слова """
+
+    folded = name.casefold()
+    starts = {0} | {
+        position + 1
+        for position, char in enumerate(folded)
+        if char.isspace()
+    }
+    return [
+        (folded[start:], name, key)
+        for start in sorted(starts) if start < len(folded)
+    ]
+
+
+class PrefixIndex:
+    """
+    Отсортированные массивы ключей для автодополнения в памяти процесса,
+    по одному на вид, поэтому type=category не просматривает
+    произведения. Ключ - название начиная с каждого слова, поэтому
+    «оре» находит «Крепкий орешек». Поиск - bisect по массиву,
+    без обращения к базе. Массив вида строится при первом запросе,
+    дальше сигналы моделей заменяют ключи одного объекта.
+    Каждое изменение сдвигает generation: сборка, начатая до него,
+    не сохраняется, иначе она вернула бы прочитанные раньше данные.
+    Записи других процессов сигналы не видят, поэтому при сдвиге
+    общей версии CATALOG массивы строятся заново.
+    """
+
+    def __init__(self):
+        self.watcher = VersionWatcher(CATALOG)
+        self.lock = threading.Lock()
+        self.build_lock = threading.Lock()
+        self.generation = 0
+        self.entries = {}
+        self.objects = {}
+
+    def invalidate(self, **kwargs):
+        with self.lock:
+            self.generation += 1
+            self.entries = {}
+            self.objects = {}
+
+    def build(self, kind):
+        with self.build_lock:
+            with self.lock:
+                if kind in self.entries:
+                    return self.entries[kind]
+                generation = self.generation
+            model, key_field = SOURCES[kind]
+            objects = {
+                pk: make_entries(name, key)
+                for pk, key, name in model.objects.values_list(
+                    'pk', key_field, 'name'
+                ).iterator()
+            }
+            entries = sorted(
+                entry for items in objects.values() for entry in items
+            )
+            with self.lock:
+                if self.generation == generation:
+                    self.entries[kind] = entries
+                    self.objects[kind] = objects
+            return entries
+
+    def update(self, kind, pk, name=None, key=None):
+        """ Заменяет ключи одного объекта; без name - удаляет их """
+
+        with self.lock:
+            self.generation += 1
+            entries = self.entries.get(kind)
+            if entries is None:
+                return
+            objects = self.objects[kind]
+            for entry in objects.pop(pk, ()):
+                del entries[bisect_left(entries, entry)]
+            if name is not None:
+                objects[pk] = make_entries(name, key)
+                for entry in objects[pk]:
+                    insort(entries, entry)
+
+    def matches(self, kind, entries, prefix):
+        position = bisect_left(entries, (prefix,))
+        while position < len(entries):
+            folded, name, key = entries[position]
+            if not folded.startswith(prefix):
+                return
+            yield folded, kind, name, key
+            position += 1
+
+    def complete(self, prefix, kinds=KINDS, limit=10):
+        if self.watcher.changed():
+            self.invalidate()
+        kinds = [kind for kind in KINDS if kind in kinds]
+        for kind in kinds:
+            if kind not in self.entries:
+                self.build(kind)
+        prefix = prefix.casefold()
+        results = []
+        seen = set()
+        with self.lock:
+            found = heapq.merge(*(
+                self.matches(kind, self.entries.get(kind, ()), prefix)
+                for kind in kinds
+            ))
+            for _, kind, name, key in found:
+                if len(results) >= limit:
+                    break
+                if (kind, key) in seen:
+                    continue
+                seen.add((kind, key))
+                results.append({
+                    'type': kind,
+                    'name': name,
+                    'id' if kind == 'title' else 'slug': key,
+                })
+        return results
+
+
+prefix_index = PrefixIndex()
@@ -0,0 +1,202 @@
+import threading
+import time
+from functools import partial
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+from reviews.models import CacheVersion
+
+CATALOG = 'catalog'
+AUTHORS = 'authors'
+REVIEWS = 'reviews:{}'
+COMMENTS = 'comments:{}'
+RESPONSE_KEY = 'api:response:{versions}:{path}'
+
+
+def get_versions(scopes):
+    """
+    Версии областей кэша и время их последней записи одним запросом
+    к общей таблице CacheVersion. У области без записей версия 0.
+    """
+    rows = {
+        scope: (version, updated)
+        for scope, version, updated in CacheVersion.objects.filter(
+            scope__in=scopes
+        ).values_list('scope', 'version', 'updated')
+    }
+    return [rows.get(scope, (0, None)) for scope in scopes]
+
+
+def bump_version(scope):
+    """
+    Сдвигает версию области, делая недействительным весь её кэш
+    во всех процессах. Один запрос INSERT ... ON CONFLICT: версия
+    растёт строго на единицу, новая строка начинается со времени
+    в наносекундах, чтобы после очистки таблицы версии не совпали
+    с прежними.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {CacheVersion._meta.db_table} '
+            '(scope, version, updated) VALUES (%s, %s, %s) '
+            'ON CONFLICT (scope) DO UPDATE '
+            'SET version = version + 1, updated = excluded.updated',
+            (scope, time.time_ns(), timezone.now())
+        )
+
+
+def bump_all():
+    """
+    Сдвигает версии всех областей после массовой записи в обход
+    сигналов. AUTHORS входит в ключи всех отзывов и комментариев,
+    поэтому вместе с CATALOG покрывает и области без строк в таблице.
+    """
+    bump_version(CATALOG)
+    bump_version(AUTHORS)
+    CacheVersion.objects.exclude(scope__in=(CATALOG, AUTHORS)).update(
+        version=F('version') + 1, updated=timezone.now()
+    )
+
+
+def bump_on_commit(scope):
+    """
+    Сдвигает версию после фиксации текущей транзакции. Раньше нельзя:
+    параллельный запрос закэшировал бы под новой версией данные,
+    которые ещё не зафиксированы.
+    """
+    transaction.on_commit(partial(bump_version, scope))
+
+
+class VersionWatcher:
+    """
+    Общая версия области для индексов в памяти процесса. changed()
+    не чаще раза в settings.INDEX_REFRESH_INTERVAL секунд читает
+    версию и сообщает, сдвинулась ли она с прошлой проверки, то есть
+    была ли запись, в том числе в другом процессе.
+    """
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.lock = threading.Lock()
+        self.version = None
+        self.checked = None
+
+    def changed(self):
+        now = time.monotonic()
+        with self.lock:
+            if (
+                self.checked is not None
+                and now - self.checked < settings.INDEX_REFRESH_INTERVAL
+            ):
+                return False
+            self.checked = now
+        [(version, _)] = get_versions([self.scope])
+        with self.lock:
+            changed = version != self.version
+            self.version = version
+        return changed
+
+
+class VersionedMixin:
+    """ Области кэша, от которых зависят ответы вьюсета """
+
+    version_scopes = (CATALOG,)
+
+    def get_version_scopes(self):
+        return self.version_scopes
+
+    def get_versions(self):
+        """ Пары (версия, время записи) областей, один запрос на запрос """
+
+        if not hasattr(self, '_versions'):
+            self._versions = get_versions(self.get_version_scopes())
+        return self._versions
+
+
+class CachedResponseMixin(VersionedMixin):
+    """
+    Кэширует ответы list и retrieve для анонимных пользователей.
+    Ключ строится из версий областей и полного URL со схемой, хостом
+    и query string: ссылки next и previous в теле абсолютные. Запись
+    в модели области сразу делает кэш недействительным.
+    Тела ответов лежат в кэше по умолчанию и могут быть локальными
+    для процесса: версии общие, так что после записи в любом процессе
+    прежние тела просто перестают находиться.
+    """
+
+    def get_cache_key(self, request):
+        return RESPONSE_KEY.format(
+            versions='-'.join(
+                str(version) for version, _ in self.get_versions()
+            ),
+            path=md5(request.build_absolute_uri().encode()).hexdigest()
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ConditionalGetMixin(VersionedMixin):
+    """
+    Поддержка ETag/If-None-Match и Last-Modified для list и retrieve.
+    Валидаторы строятся из версий областей, а не из тела ответа,
+    поэтому 304 отдаётся после одного запроса версий, без сериализации.
+    Проверяется только ETag: Last-Modified с точностью до секунды
+    не различает две записи за одну секунду и отдаётся для справки.
+    """
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        versions = self.get_versions()
+        etag = quote_etag(md5(
+            f'{[version for version, _ in versions]}:'
+            f'{request.get_full_path()}:'
+            f'{request.META.get("HTTP_ACCEPT", "")}'.encode()
+        ).hexdigest())
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            return response
+        response = handler(request, *args, **kwargs)
+        updated = [updated for _, updated in versions if updated]
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+            if updated:
+                response['Last-Modified'] = http_date(
+                    max(updated).timestamp()
+                )
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -0,0 +1,95 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+
+from reviews.models import Title
+
+FACETS_PARAM = 'facets'
+FACETS_KEY = 'api:facets:{version}:{signature}'
+# Параметры, которые не меняют набор отфильтрованных произведений.
+IGNORED_PARAMS = (
+    'facets', 'limit', 'offset', 'page', 'cursor', 'fields', 'omit'
+)
+
+
+def genre_facet(queryset):
+    return Title.genre.through.objects.filter(
+        title__in=queryset.values('pk')
+    ).values_list('genre__slug').annotate(count=Count('title_id'))
+
+
+def category_facet(queryset):
+    return queryset.filter(category__isnull=False).values_list(
+        'category__slug'
+    ).annotate(count=Count('id'))
+
+
+def year_facet(queryset):
+    return queryset.values_list('year').annotate(count=Count('id'))
+
+
+FACETS = {
+    'genre': genre_facet,
+    'category': category_facet,
+    'year': year_facet,
+}
+
+
+class FacetMixin:
+    """
+    Добавляет в ответ list счётчики ?facets=genre,category,year
+    для текущего набора фильтров. Каждый фасет - один GROUP BY запрос,
+    результат кэшируется по версиям областей вьюсета (VersionedMixin)
+    и сигнатуре фильтров.
+    """
+
+    def get_facet_names(self, request):
+        value = request.query_params.get(FACETS_PARAM, '')
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = sorted(set(names) - set(FACETS))
+        if unknown:
+            raise ValidationError({FACETS_PARAM: [
+                f'Неизвестные фасеты: {", ".join(unknown)}. '
+                f'Доступны: {", ".join(FACETS)}.'
+            ]})
+        return list(dict.fromkeys(names))
+
+    def get_facets_cache_key(self, request, names):
+        params = sorted(
+            (key, value)
+            for key, values in request.query_params.lists()
+            if key not in IGNORED_PARAMS
+            for value in values
+        )
+        signature = md5(f'{names}:{params}'.encode()).hexdigest()
+        return FACETS_KEY.format(
+            version='-'.join(
+                str(version) for version, _ in self.get_versions()
+            ),
+            signature=signature
+        )
+
+    def get_facets(self, request, names):
+        key = self.get_facets_cache_key(request, names)
+        facets = cache.get(key)
+        if facets is None:
+            queryset = self.filter_queryset(self.get_queryset()).order_by()
+            facets = {}
+            for name in names:
+                rows = sorted(
+                    FACETS[name](queryset), key=lambda row: (-row[1], row[0])
+                )
+                facets[name] = {str(value): count for value, count in rows}
+            cache.set(key, facets, settings.API_CACHE_TIMEOUT)
+        return facets
+
+    def list(self, request, *args, **kwargs):
+        names = self.get_facet_names(request)
+        response = super().list(request, *args, **kwargs)
+        if names and response.status_code == status.HTTP_200_OK:
+            response.data[FACETS_PARAM] = self.get_facets(request, names)
+        return response
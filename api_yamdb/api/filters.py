@@ -1,14 +1,126 @@
-from django_filters import CharFilter, FilterSet, NumberFilter
+from django.db.models import (Case, ExpressionWrapper, F, FloatField,
+                              IntegerField, When)
+from django_filters import (BaseInFilter, CharFilter, ChoiceFilter, FilterSet,
+                            NumberFilter)
+from rest_framework import status
+from rest_framework.filters import BaseFilterBackend
 
 from reviews.models import Title
+from reviews.search import get_search_index
+
+# Рейтинг в ответе округлён до десятых, поэтому границы сдвигаются
+# на половину шага: rating_min=7 включает среднее 6.96, показанное как 7.0.
+RATING_HALF_STEP = 0.05
+
+
+class CharInFilter(BaseInFilter, CharFilter):
+    pass
 
 
 class TitleFilter(FilterSet):
+    """
+    Фильтры списка произведений. Все условия собираются в один SQL-запрос:
+    жанры через IN-подзапрос к промежуточной таблице (план идёт
+    от индекса slug жанра, а не просмотром всех произведений),
+    рейтинг - по сохранённым сумме и количеству оценок.
+    """
+
     category = CharFilter(field_name='category__slug')
-    genre = CharFilter(field_name='genre__slug')
+    category__in = CharInFilter(field_name='category__slug', lookup_expr='in')
+    genre = CharFilter(method='filter_genre')
+    genre_mode = ChoiceFilter(
+        choices=(('any', 'any'), ('all', 'all')),
+        method='filter_genre_mode'
+    )
     name = CharFilter(field_name='name')
     year = NumberFilter(field_name='year')
+    year_min = NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = NumberFilter(field_name='year', lookup_expr='lte')
+    rating_min = NumberFilter(method='filter_rating_min')
+    rating_max = NumberFilter(method='filter_rating_max')
 
     class Meta:
         model = Title
         fields = ('category', 'genre', 'name', 'year')
+
+    def filter_genre(self, queryset, name, value):
+        """ genre=drama,comedy: любой из жанров, при genre_mode=all - все """
+
+        slugs = {slug.strip() for slug in value.split(',') if slug.strip()}
+        if not slugs:
+            return queryset
+        links = Title.genre.through.objects.values('title_id')
+        if self.form.cleaned_data.get('genre_mode') == 'all':
+            for slug in sorted(slugs):
+                queryset = queryset.filter(
+                    id__in=links.filter(genre__slug=slug)
+                )
+            return queryset
+        return queryset.filter(id__in=links.filter(genre__slug__in=slugs))
+
+    def filter_genre_mode(self, queryset, name, value):
+        """ Учитывается в filter_genre """
+
+        return queryset
+
+    def rating_bound(self, value, shift):
+        return ExpressionWrapper(
+            F('rating_count') * (float(value) + shift),
+            output_field=FloatField()
+        )
+
+    def filter_rating_min(self, queryset, name, value):
+        return queryset.filter(
+            rating_count__gt=0,
+            rating_sum__gte=self.rating_bound(value, -RATING_HALF_STEP)
+        )
+
+    def filter_rating_max(self, queryset, name, value):
+        return queryset.filter(
+            rating_count__gt=0,
+            rating_sum__lt=self.rating_bound(value, RATING_HALF_STEP)
+        )
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """
+    Полнотекстовый поиск ?search= по названию и описанию произведения,
+    результаты упорядочены по релевантности. Выдача ограничена
+    max_results лучшими совпадениями; если их больше, вьюсет
+    с SearchLimitMixin отмечает это в ответе.
+    """
+
+    search_param = 'search'
+    max_results = 500
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        ids = get_search_index().search(query, self.max_results + 1)
+        view.search_truncated = len(ids) > self.max_results
+        ids = ids[:self.max_results]
+        ranking = Case(
+            *[When(id=pk, then=position) for position, pk in enumerate(ids)],
+            output_field=IntegerField()
+        )
+        return queryset.filter(id__in=ids).order_by(ranking)
+
+
+class SearchLimitMixin:
+    """
+    Добавляет в ответ list "search_limit", если поиск нашёл больше
+    TitleSearchFilter.max_results совпадений: тогда count и страницы
+    относятся только к лучшим из них.
+    """
+
+    search_truncated = False
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if (
+            self.search_truncated
+            and response.status_code == status.HTTP_200_OK
+        ):
+            response.data['search_limit'] = TitleSearchFilter.max_results
+        return response
@@ -0,0 +1,432 @@
+import json
+import time
+import tracemalloc
+from io import BytesIO, StringIO
+from itertools import count
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries
+from django.db.models import Count
+from django.test.utils import (CaptureQueriesContext, override_settings,
+                               setup_test_environment,
+                               teardown_test_environment)
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+
+from api.cache import AUTHORS, CATALOG, COMMENTS, REVIEWS, bump_version
+from api.renderers import FastJSONParser, FastJSONRenderer
+from api.urls import router, urlpatterns
+from api.serializers import UserSerializer
+from api.views import (AutocompleteAPIView, LeaderboardAPIView,
+                       RegisterAPIView, TokenAPIView)
+from api.utils import create_token, generate, send_confirmation_code
+from reviews.models import Category, Genre, Title, User
+
+
+def percentile(values, share):
+    values = sorted(values)
+    index = min(len(values) - 1, round(share * (len(values) - 1)))
+    return values[index]
+
+
+class LegacyRegisterAPIView(RegisterAPIView):
+    """
+    Прежняя регистрация для сравнения в замере signup_burst:
+    поиск пользователя, затем валидация UserSerializer и сохранение.
+    """
+
+    def post(self, request):
+        serializer = self.register_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors, status=status.HTTP_400_BAD_REQUEST
+            )
+        username = serializer.validated_data.get('username')
+        email = serializer.validated_data.get('email')
+        user = User.objects.filter(username=username, email=email).first()
+        if user:
+            code = user.confirmation_code
+        else:
+            code = generate()
+            user = UserSerializer(data={
+                'username': username,
+                'email': email,
+                'confirmation_code': code
+            })
+            if not user.is_valid():
+                return Response(
+                    user.errors, status=status.HTTP_400_BAD_REQUEST
+                )
+            user.save()
+        send_confirmation_code(email, code)
+        return Response(dict(serializer.validated_data))
+
+
+class Command(BaseCommand):
+    """
+    Нагрузочный прогон всех маршрутов api/urls.py на синтетических данных:
+    python manage.py benchmark_api --titles 200 --reviews 20 --comments 3
+    Данные создаются во временной тестовой базе. Для каждого маршрута
+    считаются запросы к базе, p50/p95 времени ответа и выделенная
+    память, отчёт сохраняется в JSON.
+    """
+
+    help = 'Замеряет запросы к базе и время ответа всех эндпоинтов API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=100)
+        parser.add_argument(
+            '--reviews', type=int, default=20,
+            help='Отзывов на произведение в среднем'
+        )
+        parser.add_argument(
+            '--comments', type=int, default=3,
+            help='Комментариев к отзыву в среднем'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Повторов каждого запроса'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=1,
+            help='Зерно генератора случайных данных'
+        )
+        parser.add_argument(
+            '--page-size', type=int, default=1000,
+            help='Размер страницы произведений для замера сериализации JSON'
+        )
+        parser.add_argument(
+            '--burst', type=int, default=200,
+            help='Регистраций в замере пропускной способности signup'
+        )
+        parser.add_argument(
+            '--use-cache',
+            action='store_true',
+            help='Не очищать кэш ответов между повторами'
+        )
+        parser.add_argument(
+            '--output', default='benchmark.json',
+            help='Файл JSON-отчёта'
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        # Повторы регистрации и получения токена упёрлись бы
+        # в ограничитель частоты, замеряется сама обработка запроса.
+        # Письма только ставятся в очередь: фоновый поток отправки
+        # конкурировал бы с замером за временную базу.
+        unthrottled = override_settings(
+            REST_FRAMEWORK={
+                **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}
+            },
+            OUTBOX_MODE='command'
+        )
+        try:
+            with unthrottled:
+                self.seed()
+                results = self.run()
+                serialization = self.serialization()
+                signup = self.signup_burst()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'dataset': {
+                key: options[key]
+                for key in ('titles', 'reviews', 'comments', 'seed')
+            },
+            'repeat': options['repeat'],
+            'results': results,
+            'serialization': serialization,
+            'signup_burst': signup,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        self.print_results(results)
+        self.print_serialization(serialization)
+        self.print_signup_burst(signup)
+        self.stdout.write(self.style.SUCCESS(
+            f'Отчёт сохранён в {options["output"]}'
+        ))
+
+    def seed(self):
+        """ Синтетические данные: N произведений, M отзывов, K комментариев """
+
+        titles = self.options['titles']
+        reviews = titles * self.options['reviews']
+        call_command(
+            'generate_dataset',
+            users=max(self.options['reviews'] * 5, 50),
+            titles=titles,
+            reviews=reviews,
+            comments=reviews * self.options['comments'],
+            seed=self.options['seed'],
+            stdout=StringIO()
+        )
+        self.admin = User.objects.create_user(
+            username='benchmark_admin',
+            email='benchmark_admin@yamdb.fake',
+            role=User.ADMIN
+        )
+        call_command('rebuild_leaderboards', stdout=StringIO())
+
+    def routes(self):
+        """
+        GET-маршруты: список и объект для каждой регистрации роутера
+        и маршруты из urlpatterns с параметрами из view_routes.
+        """
+        title = Title.objects.order_by('-rating_count').first()
+        review = title.reviews.annotate(
+            comments_count=Count('comments')
+        ).order_by('-comments_count').first()
+        # Области кэша, которые сдвигает prepare между повторами.
+        self.scopes = (
+            CATALOG, AUTHORS,
+            REVIEWS.format(title.id), COMMENTS.format(review.id)
+        )
+        samples = {
+            'title': title,
+            'category': Category.objects.first(),
+            'genre': Genre.objects.first(),
+            'user': self.admin,
+            'reviews': review,
+            'comments': review.comments.first(),
+        }
+        parents = {'title_id': title.id, 'review_id': review.id}
+        seen = set()
+        for prefix, viewset, basename in router.registry:
+            if basename in seen:
+                continue
+            seen.add(basename)
+            kwargs = {
+                name: value for name, value in parents.items()
+                if name in prefix
+            }
+            yield basename, reverse(f'api:{basename}-list', kwargs=kwargs)
+            lookup = viewset.lookup_url_kwarg or viewset.lookup_field
+            value = getattr(samples[basename], viewset.lookup_field)
+            yield basename, reverse(
+                f'api:{basename}-detail', kwargs={**kwargs, lookup: value}
+            )
+        views = self.view_routes(title)
+        for pattern in urlpatterns:
+            view_class = getattr(pattern.callback, 'view_class', None)
+            if view_class is None or not hasattr(view_class, 'get'):
+                continue
+            if view_class not in views:
+                self.stderr.write(
+                    f'Маршрут {pattern.pattern} не замеряется: '
+                    f'нет параметров в view_routes'
+                )
+                continue
+            for kwargs, query in views[view_class]:
+                url = reverse(f'api:{pattern.name}', kwargs=kwargs)
+                if query:
+                    url = f'{url}?{urlencode(query)}'
+                yield pattern.name, url
+
+    def view_routes(self, title):
+        """ Параметры GET-маршрутов вне роутера: view -> (kwargs, query) """
+
+        genre = title.genre.first()
+        return {
+            AutocompleteAPIView: [
+                ({}, {'q': title.name.split()[0][:3]}),
+                ({}, {'q': title.name.split()[0][:3], 'type': 'title'}),
+            ],
+            LeaderboardAPIView: [
+                ({'board': 'top'}, {}),
+                ({'board': 'top'}, {'genre': genre.slug} if genre else {}),
+                ({'board': 'trending'}, {}),
+            ],
+        }
+
+    def run(self):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {create_token(self.admin)}'
+        )
+        results = []
+        for basename, url in self.routes():
+            self.stdout.write(f'GET {url}')
+            results.append(self.measure(url, lambda: client.get(url)))
+        for url, payload in self.auth_routes():
+            self.stdout.write(f'POST {url}')
+            results.append(self.measure(
+                url, lambda: APIClient().post(url, data=payload())
+            ))
+        return results
+
+    def auth_routes(self):
+        """ POST-маршруты регистрации и получения токена """
+
+        numbers = count()
+
+        def signup():
+            number = next(numbers)
+            return {
+                'username': f'signup{number}',
+                'email': f'signup{number}@yamdb.fake',
+            }
+
+        payloads = {
+            RegisterAPIView: signup,
+            TokenAPIView: lambda: {
+                'username': self.admin.username,
+                'confirmation_code': self.admin.confirmation_code,
+            },
+        }
+        for pattern in urlpatterns:
+            view_class = getattr(pattern.callback, 'view_class', None)
+            if view_class in payloads:
+                yield f'/api/{pattern.pattern}', payloads[view_class]
+
+    def serialization(self):
+        """
+        Время рендеринга и разбора JSON для большой страницы произведений
+        стандартными классами DRF и FastJSONRenderer/FastJSONParser.
+        """
+        url = f'/api/v1/titles/?limit={self.options["page_size"]}'
+        data = APIClient().get(url).data
+        results = []
+        for renderer, parser in (
+            (JSONRenderer(), JSONParser()),
+            (FastJSONRenderer(), FastJSONParser()),
+        ):
+            content = renderer.render(data)
+            render_timings, parse_timings = [], []
+            for _ in range(self.options['repeat']):
+                started = time.perf_counter()
+                renderer.render(data)
+                render_timings.append((time.perf_counter() - started) * 1000)
+                started = time.perf_counter()
+                parser.parse(BytesIO(content))
+                parse_timings.append((time.perf_counter() - started) * 1000)
+            results.append({
+                'renderer': type(renderer).__name__,
+                'route': url,
+                'bytes': len(content),
+                'render_p50_ms': round(percentile(render_timings, 0.5), 3),
+                'parse_p50_ms': round(percentile(parse_timings, 0.5), 3),
+            })
+        return results
+
+    @override_settings(OUTBOX_MODE='command')
+    def signup_burst(self):
+        """
+        Пропускная способность регистрации прежней и текущей реализации:
+        серия новых пользователей, затем повтор тех же запросов.
+        Письма только ставятся в очередь, их отправка не замеряется.
+        """
+        factory = APIRequestFactory()
+        burst = self.options['burst']
+        results = []
+        for name, view in (
+            ('legacy', LegacyRegisterAPIView.as_view()),
+            ('upsert', RegisterAPIView.as_view()),
+        ):
+            payloads = [
+                {'username': f'{name}{number}',
+                 'email': f'{name}{number}@yamdb.fake'}
+                for number in range(burst)
+            ]
+            for phase in ('new', 'repeat'):
+                reset_queries()
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    for payload in payloads:
+                        view(factory.post(
+                            '/api/v1/auth/signup/', payload, format='json'
+                        ))
+                    elapsed = time.perf_counter() - started
+                results.append({
+                    'implementation': name,
+                    'phase': phase,
+                    'requests': burst,
+                    'requests_per_s': round(burst / elapsed, 1),
+                    'queries_per_request': round(len(queries) / burst, 2),
+                })
+        return results
+
+    def measure(self, name, request):
+        repeat = self.options['repeat']
+        request()
+        self.prepare()
+        # request_started очищает журнал запросов, поэтому отсчёт с нуля.
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            status_code = request().status_code
+        timings = []
+        for _ in range(repeat):
+            self.prepare()
+            started = time.perf_counter()
+            request()
+            timings.append((time.perf_counter() - started) * 1000)
+        self.prepare()
+        tracemalloc.start()
+        request()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            'route': name,
+            'status': status_code,
+            'queries': len(queries),
+            'p50_ms': round(percentile(timings, 0.5), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'peak_alloc_kb': round(peak / 1024, 1),
+        }
+
+    def prepare(self):
+        """
+        Холодный кэш ответов: сдвиг версий делает недоступными тела
+        ответов и фасеты, а кэш аутентификации остаётся прогретым.
+        """
+        if not self.options['use_cache']:
+            for scope in self.scopes:
+                bump_version(scope)
+
+    def print_results(self, results):
+        self.stdout.write(
+            f'{"маршрут":<55}{"статус":>7}{"запросы":>9}'
+            f'{"p50, мс":>10}{"p95, мс":>10}{"память, КБ":>12}'
+        )
+        for row in results:
+            self.stdout.write(
+                f'{row["route"]:<55}{row["status"]:>7}{row["queries"]:>9}'
+                f'{row["p50_ms"]:>10}{row["p95_ms"]:>10}'
+                f'{row["peak_alloc_kb"]:>12}'
+            )
+
+    def print_serialization(self, results):
+        self.stdout.write(
+            f'{"рендерер":<20}{"байт":>12}'
+            f'{"рендеринг p50, мс":>20}{"разбор p50, мс":>17}'
+        )
+        for row in results:
+            self.stdout.write(
+                f'{row["renderer"]:<20}{row["bytes"]:>12}'
+                f'{row["render_p50_ms"]:>20}{row["parse_p50_ms"]:>17}'
+            )
+
+    def print_signup_burst(self, results):
+        self.stdout.write(
+            f'{"регистрация":<20}{"фаза":>8}{"запросов/с":>14}'
+            f'{"SQL на запрос":>16}'
+        )
+        for row in results:
+            self.stdout.write(
+                f'{row["implementation"]:<20}{row["phase"]:>8}'
+                f'{row["requests_per_s"]:>14}{row["queries_per_request"]:>16}'
+            )
@@ -0,0 +1,122 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import Http404
+
+from api.filters import TitleFilter
+from api.urls import router
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+# SQLite: «SCAN reviews_title» без индекса; PostgreSQL: «Seq Scan».
+SCAN_RE = re.compile(r'SCAN \w+(?! USING)\s*$|Seq Scan', re.MULTILINE)
+# SQLite: сортировка во временном B-дереве вместо порядка индекса.
+SORT_RE = re.compile(r'USE TEMP B-TREE')
+# Какие признаки плана отмечаются для каждого вида запроса. Список
+# и курсор без фильтра читают таблицу целиком по определению, страницу
+# ограничивает LIMIT; поиск одной строки по ключу сортировать нечего.
+CHECKS = {
+    'list': (SORT_RE,),
+    'detail': (SCAN_RE,),
+    'filter': (SCAN_RE, SORT_RE),
+}
+
+
+class Command(BaseCommand):
+    """
+    Выполняет EXPLAIN (на SQLite - EXPLAIN QUERY PLAN) для querysets
+    всех вьюсетов роутера, их поиска по lookup_field, курсорных
+    сортировок и фильтров TitleFilter, и отмечает полные просмотры таблиц:
+    python manage.py explain_querysets --fail-on-scan
+    Для списков и курсоров без фильтра полный просмотр ожидаем -
+    у них отмечается только сортировка во временном B-дереве.
+    У поиска одной строки по ключу такая сортировка не отмечается.
+    """
+
+    help = 'Показывает планы запросов вьюсетов и отмечает полные просмотры'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fail-on-scan',
+            action='store_true',
+            help='Завершиться с ошибкой, если найден полный просмотр'
+        )
+
+    def handle(self, *args, **options):
+        flagged = []
+        for name, kind, queryset in self.querysets():
+            plan = queryset.explain()
+            scan = any(check.search(plan) for check in CHECKS[kind])
+            if scan:
+                flagged.append(name)
+            style = self.style.WARNING if scan else self.style.SUCCESS
+            self.stdout.write(style(
+                f'{"SCAN" if scan else "OK  "} {name}'
+            ))
+            for line in plan.splitlines():
+                self.stdout.write(f'       {line}')
+        if flagged and options['fail_on_scan']:
+            raise CommandError(
+                f'Полный просмотр таблицы в {len(flagged)} запросах: '
+                + ', '.join(flagged)
+            )
+
+    def samples(self):
+        title = Title.objects.first() or Title(id=1)
+        review = Review.objects.first() or Review(id=1, title=title)
+        return {
+            'title': title,
+            'category': Category.objects.first() or Category(slug='slug'),
+            'genre': Genre.objects.first() or Genre(slug='slug'),
+            'user': User.objects.first() or User(username='username'),
+            'reviews': review,
+            'comments': Comment.objects.first() or Comment(id=1),
+        }
+
+    def querysets(self):
+        samples = self.samples()
+        review = samples['reviews']
+        parents = {'title_id': review.title_id, 'review_id': review.id}
+        seen = set()
+        for prefix, viewset, basename in router.registry:
+            if basename in seen:
+                continue
+            seen.add(basename)
+            view = viewset(
+                kwargs={
+                    name: value for name, value in parents.items()
+                    if name in prefix
+                },
+                request=None,
+                format_kwarg=None,
+                action='list'
+            )
+            try:
+                queryset = view.get_queryset()
+            except Http404:
+                self.stdout.write(f'---- {basename}: нет данных для URL')
+                continue
+            yield f'{basename} list', 'list', queryset
+            lookup = viewset.lookup_field
+            value = getattr(samples[basename], lookup)
+            yield (f'{basename} detail', 'detail',
+                   queryset.filter(**{lookup: value}))
+            cursor = getattr(
+                viewset.pagination_class, 'cursor_pagination_class', None
+            )
+            if cursor is not None:
+                yield (f'{basename} cursor', 'list',
+                       queryset.order_by(*cursor.ordering))
+
+        titles = Title.objects.all()
+        genres = f'{samples["genre"].slug},other'
+        filters = {
+            'name': {'name': samples['title'].name or 'name'},
+            'year': {'year': samples['title'].year or 2000},
+            'category': {'category': samples['category'].slug},
+            'genre': {'genre': samples['genre'].slug},
+            'genre any': {'genre': genres},
+            'genre all': {'genre': genres, 'genre_mode': 'all'},
+        }
+        for name, params in filters.items():
+            filterset = TitleFilter(params, queryset=titles)
+            yield f'title filter {name}', 'filter', filterset.qs
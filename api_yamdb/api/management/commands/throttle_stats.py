@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+from api.throttling import get_store
+
+
+class Command(BaseCommand):
+    """
+    Показывает, сколько запросов к эндпоинтам аутентификации отклонено
+    ограничителем частоты во всех процессах, и удаляет наполнившиеся
+    бакеты:
+    python manage.py throttle_stats
+    """
+
+    help = 'Показывает счётчики отклонённых ограничителем запросов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Очистить бакеты и счётчики'
+        )
+
+    def handle(self, *args, **options):
+        store = get_store()
+        self.stdout.write(f'Удалено наполнившихся бакетов: {store.prune()}')
+        rejections = store.rejections()
+        if not rejections:
+            self.stdout.write('Отклонённых запросов нет')
+        for scope, row in rejections.items():
+            last = datetime.fromtimestamp(row['last']).isoformat(
+                sep=' ', timespec='seconds'
+            )
+            self.stdout.write(
+                f'{scope:<20}{row["count"]:>10}  последний: {last}'
+            )
+        if options['reset']:
+            store.reset()
+            self.stdout.write(self.style.SUCCESS('Счётчики очищены'))
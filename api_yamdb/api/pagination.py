@@ -0,0 +1,63 @@
+from rest_framework import pagination
+
+
+class IdCursorPagination(pagination.CursorPagination):
+    """ Курсорная пагинация по первичному ключу """
+
+    ordering = ('id',)
+
+
+class PubDateCursorPagination(pagination.CursorPagination):
+    """ Курсорная пагинация по дате публикации, новые записи первыми """
+
+    ordering = ('-pub_date', '-id')
+
+
+class OptionalCursorPagination(pagination.BasePagination):
+    """
+    Пагинация, которая переключается на курсорную, если в запросе
+    передан параметр cursor (в том числе пустой - первая страница).
+    Курсор не считает COUNT(*) и не использует OFFSET,
+    поэтому глубокие страницы стоят столько же, сколько первая.
+    """
+
+    default_pagination_class = pagination.PageNumberPagination
+    cursor_pagination_class = None
+    # Параметры со своим порядком выдачи, например релевантность поиска:
+    # курсор упорядочил бы по своему полю, поэтому с ними он не включается.
+    ordered_params = ()
+    # Выбирается в paginate_queryset; детальные представления его
+    # не вызывают, а браузерный API всё равно спрашивает о пагинации.
+    paginator = None
+
+    def get_paginator(self, request):
+        cursor_param = self.cursor_pagination_class.cursor_query_param
+        if cursor_param in request.query_params and not any(
+            request.query_params.get(param) for param in self.ordered_params
+        ):
+            return self.cursor_pagination_class()
+        return self.default_pagination_class()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.paginator, 'display_page_controls', False)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+
+class TitlePagination(OptionalCursorPagination):
+    default_pagination_class = pagination.LimitOffsetPagination
+    cursor_pagination_class = IdCursorPagination
+    ordered_params = ('search',)
+
+
+class PubDatePagination(OptionalCursorPagination):
+    cursor_pagination_class = PubDateCursorPagination
@@ -33,7 +33,7 @@ class IsAuthor(permissions.BasePermission):
     message = 'Изменять чужой контент запрещенно!'
 
     def has_object_permission(self, request, view, obj):
-        return bool(request.user == obj.author)
+        return bool(request.user.id == obj.author_id)
 
 
 class IsAdminOrReadOnly(permissions.BasePermission):
@@ -72,7 +72,7 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj):
         return (request.method in permissions.SAFE_METHODS
-                or obj.author == request.user
+                or obj.author_id == request.user.id
                 or request.user.is_admin
                 or request.user.is_moderator
                 )
@@ -88,7 +88,7 @@ class ReviewAndCommentPermission(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj):
         return (request.method in permissions.SAFE_METHODS
-                or obj.author == request.user
+                or obj.author_id == request.user.id
                 or request.user.is_moderator
                 or request.user.is_admin
                 or request.user.is_superuser
@@ -1,11 +1,14 @@
 import re
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
+from rest_framework.settings import api_settings
 
 from .validators import validate_name
 from reviews.models import Genre, Category, Title, User, Review, Comment
 
+DATETIME_FIELD = serializers.DateTimeField()
+
 
 class ReviewSerializer(serializers.ModelSerializer):
     """Сериализатор для отзывов к произведениям."""
@@ -19,20 +22,29 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'score', 'pub_date')
         read_only_fields = ('pub_date',)
 
-    def validate(self, data):
-        """Запрет публицакии только одного отзыва на каждое произведение."""
-        if self.context['request'].method != 'POST':
-            return data
-        title_id = self.context['view'].kwargs.get('title_id')
-        author = self.context['request'].user
-        review = Review.objects.filter(
-            author=author, title=title_id
-        )
-        if review.exists():
-            raise serializers.ValidationError(
-                'На каждое произведение можно опубликовать только один отзыв.'
-            )
-        return data
+    def create(self, validated_data):
+        """
+        Запрет публикации более одного отзыва на каждое произведение.
+        Проверку делает уникальное ограничение в базе: без отдельного
+        запроса и без гонки между одновременными POST-запросами.
+        Другие нарушения целостности, например удалённое произведение,
+        не выдаются за дубликат.
+        """
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                title=validated_data['title'],
+                author=validated_data['author']
+            ).exists():
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'На каждое произведение можно опубликовать '
+                    'только один отзыв.'
+                ]
+            })
 
     def validate_score(self, value):
         """Запрет публикации отзыва с некорректной оценкой."""
@@ -56,6 +68,54 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ('pub_date',)
 
 
+class ReadSerializer(serializers.BaseSerializer):
+    """
+    Сериализатор только для чтения: поле ответа - функция от объекта.
+    context['fields'] ограничивает вывод, остальные атрибуты объекта
+    не читаются, поэтому отложенные через .only() столбцы не подгружаются.
+    """
+
+    getters = {}
+
+    def to_representation(self, instance):
+        fields = self.context.get('fields')
+        return {
+            name: getter(instance)
+            for name, getter in self.getters.items()
+            if fields is None or name in fields
+        }
+
+
+def pub_date(obj):
+    return DATETIME_FIELD.to_representation(obj.pub_date)
+
+
+class ReviewReadSerializer(ReadSerializer):
+    """
+    Только чтение отзывов: тот же вывод, что у ReviewSerializer,
+    без обхода полей ModelSerializer. Автор - из select_related.
+    """
+
+    getters = {
+        'id': lambda review: review.id,
+        'text': lambda review: review.text,
+        'author': lambda review: review.author.username,
+        'score': lambda review: review.score,
+        'pub_date': pub_date,
+    }
+
+
+class CommentReadSerializer(ReadSerializer):
+    """ Только чтение комментариев, вывод как у CommentSerializer """
+
+    getters = {
+        'id': lambda comment: comment.id,
+        'text': lambda comment: comment.text,
+        'author': lambda comment: comment.author.username,
+        'pub_date': pub_date,
+    }
+
+
 class GenreSerializer(serializers.ModelSerializer):
     """Сериализатор для жанров произведений."""
     class Meta:
@@ -76,18 +136,35 @@ class TitleGetSerializer(serializers.ModelSerializer):
     """Сериализатор для GET запросов произведений."""
     category = CategorySerializer()
     genre = GenreSerializer(many=True)
-    rating = serializers.SerializerMethodField()
+    rating = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Title
         fields = ('id', 'name', 'year', 'rating', 'description', 'genre',
                   'category')
 
-    def get_rating(self, obj):
-        rating = obj.reviews.aggregate(Avg('score')).get('score__avg')
-        if not rating:
-            return rating
-        return round(rating, 1)
+
+def slug_object(obj):
+    return {'name': obj.name, 'slug': obj.slug} if obj else None
+
+
+class TitleReadSerializer(ReadSerializer):
+    """
+    Только чтение произведений, вывод как у TitleGetSerializer.
+    Категория - из select_related, жанры - из prefetch_related.
+    """
+
+    getters = {
+        'id': lambda title: title.id,
+        'name': lambda title: title.name,
+        'year': lambda title: title.year,
+        'rating': lambda title: title.rating,
+        'description': lambda title: title.description,
+        'genre': lambda title: [
+            slug_object(genre) for genre in title.genre.all()
+        ],
+        'category': lambda title: slug_object(title.category),
+    }
 
 
 class TitlePostSerializer(serializers.ModelSerializer):
@@ -136,8 +213,7 @@ class UserSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 'Пользователь с таким username уже существует'
             )
-        pattern = re.compile(r'^[\w.@+-]+')
-        if not pattern.match(value):
+        if not re.fullmatch(r'[\w.@+-]+', value):
             raise serializers.ValidationError(
                 'Неверный формат поля'
             )
@@ -166,8 +242,9 @@ class RegisterSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 'Использовать имя "me" в качестве username запрещено'
             )
-        pattern = re.compile(r'^[\w.@+-]+')
-        if not pattern.match(value):
+        # Вся строка целиком, как UnicodeUsernameValidator модели:
+        # регистрация создаёт пользователя одним INSERT без валидаторов.
+        if not re.fullmatch(r'[\w.@+-]+', value):
             raise serializers.ValidationError(
                 r'Поле username должно соответсвовать паттерну: ^[\w.@+-]+\z'
             )
@@ -0,0 +1,100 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_save)
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from .authentication import (forget_token_version, set_token_version,
+                             user_cache)
+from .autocomplete import SOURCES, prefix_index
+from .cache import AUTHORS, CATALOG, COMMENTS, REVIEWS, bump_on_commit
+
+
+def invalidate_catalog(sender, action=None, **kwargs):
+    """ Сбрасывает кэш каталога при любой записи в его модели """
+
+    if action is None or action.startswith('post_'):
+        bump_on_commit(CATALOG)
+
+
+def invalidate_reviews(sender, instance, **kwargs):
+    bump_on_commit(REVIEWS.format(instance.title_id))
+
+
+def invalidate_comments(sender, instance, **kwargs):
+    bump_on_commit(COMMENTS.format(instance.review_id))
+
+
+def remember_username(sender, instance, **kwargs):
+    instance._username_snapshot = (
+        None if 'username' in instance.get_deferred_fields()
+        else instance.username
+    )
+
+
+def invalidate_authors(sender, instance, created, **kwargs):
+    """
+    В отзывах и комментариях выводится username автора, поэтому
+    их кэш сбрасывается только при смене username. Новый пользователь
+    ещё ничего не написал, а при удалении его отзывы и комментарии
+    сбрасывают свои области сами.
+    """
+    if not created and instance.username != instance._username_snapshot:
+        bump_on_commit(AUTHORS)
+    instance._username_snapshot = instance.username
+
+
+def invalidate_user(sender, instance, **kwargs):
+    """ Роль и активность пользователя читаются из кэша аутентификации """
+
+    user_cache.invalidate(instance.pk)
+
+
+def update_token_version(sender, instance, **kwargs):
+    set_token_version(instance)
+
+
+def remove_token_version(sender, instance, **kwargs):
+    """ Токены удалённого пользователя больше не проходят проверку """
+
+    forget_token_version(instance.pk)
+
+
+def update_prefix_index(sender, instance, kind, **kwargs):
+    """ Ключи автодополнения объекта меняются после фиксации записи """
+
+    _, key_field = SOURCES[kind]
+    transaction.on_commit(partial(
+        prefix_index.update, kind, instance.pk,
+        instance.name, getattr(instance, key_field)
+    ))
+
+
+def remove_from_prefix_index(sender, instance, kind, **kwargs):
+    transaction.on_commit(partial(prefix_index.update, kind, instance.pk))
+
+
+for model in (Title, Genre, Category, Review):
+    post_save.connect(invalidate_catalog, sender=model)
+    post_delete.connect(invalidate_catalog, sender=model)
+m2m_changed.connect(invalidate_catalog, sender=Title.genre.through)
+for model, handler in (
+    (Review, invalidate_reviews),
+    (Comment, invalidate_comments),
+    (User, invalidate_user),
+):
+    post_save.connect(handler, sender=model)
+    post_delete.connect(handler, sender=model)
+post_init.connect(remember_username, sender=User)
+post_save.connect(invalidate_authors, sender=User)
+post_save.connect(update_token_version, sender=User)
+post_delete.connect(remove_token_version, sender=User)
+for kind, (model, _) in SOURCES.items():
+    post_save.connect(
+        partial(update_prefix_index, kind=kind), sender=model, weak=False
+    )
+    post_delete.connect(
+        partial(remove_from_prefix_index, kind=kind), sender=model,
+        weak=False
+    )
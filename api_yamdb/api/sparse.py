@@ -0,0 +1,86 @@
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def split_param(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class SparseFieldsMixin:
+    """
+    ?fields=id,name и ?omit=description для list и retrieve.
+    Лишние поля убираются из ответа, а их столбцы и связи - из SQL:
+    queryset ограничивается .only(), select_related и prefetch_related
+    остаются только для запрошенных полей.
+    sparse_columns: поле ответа -> столбцы модели для .only(),
+    связь через '__' добавляется в select_related.
+    sparse_prefetch: поле ответа -> связь для prefetch_related.
+    sparse_required: столбцы, нужные всегда, например для курсора.
+    """
+
+    sparse_actions = ('list', 'retrieve')
+    sparse_required = ()
+    sparse_columns = {}
+    sparse_prefetch = {}
+
+    def get_sparse_fields(self):
+        """ Запрошенные поля ответа или None, если ответ полный """
+
+        if hasattr(self, '_sparse_fields'):
+            return self._sparse_fields
+        self._sparse_fields = None
+        params = self.request.query_params
+        fields = split_param(params.get(FIELDS_PARAM, ''))
+        omit = split_param(params.get(OMIT_PARAM, ''))
+        if self.action not in self.sparse_actions or not (fields or omit):
+            return None
+        unknown = sorted(set(fields + omit) - set(self.sparse_columns))
+        if unknown:
+            raise ValidationError({FIELDS_PARAM: [
+                f'Неизвестные поля: {", ".join(unknown)}. '
+                f'Доступны: {", ".join(self.sparse_columns)}.'
+            ]})
+        self._sparse_fields = [
+            name for name in self.sparse_columns
+            if (not fields or name in fields) and name not in omit
+        ]
+        return self._sparse_fields
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        columns = [
+            column for name in fields for column in self.sparse_columns[name]
+        ]
+        related = {
+            column.rsplit('__', 1)[0] for column in columns if '__' in column
+        }
+        prefetch = [
+            self.sparse_prefetch[name] for name in fields
+            if name in self.sparse_prefetch
+        ]
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if related:
+            queryset = queryset.select_related(*sorted(related))
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset.only('pk', *self.sparse_required, *columns)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_sparse_fields()
+        return context
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_sparse_fields()
+        target = getattr(serializer, 'child', serializer)
+        if fields is not None and isinstance(target, serializers.Serializer):
+            for name in set(target.fields) - set(fields):
+                target.fields.pop(name)
+        return serializer
@@ -0,0 +1,213 @@
+import logging
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    """ '10/min' -> (10 токенов в бакете, 10 / 60 токена в секунду) """
+
+    if rate is None:
+        return None
+    number, period = rate.split('/')
+    capacity = int(number)
+    return capacity, capacity / DURATIONS[period[0]]
+
+
+class SQLiteBucketStore:
+    """
+    Токен-бакеты в файле SQLite, общем для всех процессов на машине.
+    BEGIN IMMEDIATE сразу берёт блокировку записи, поэтому списание
+    токена из разных процессов не теряется. Там же хранится счётчик
+    отклонённых запросов по областям.
+    Бакет, который снова наполнился до capacity, ничем не отличается
+    от отсутствующего, поэтому consume не чаще раза в prune_interval
+    секунд удаляет такие строки.
+    """
+
+    def __init__(self, path, prune_interval=None):
+        self.path = str(path)
+        self.prune_interval = (
+            settings.THROTTLE_PRUNE_INTERVAL
+            if prune_interval is None else prune_interval
+        )
+        self.pruned = time.time()
+        self.local = threading.local()
+
+    def connect(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS buckets ('
+                'key TEXT PRIMARY KEY, tokens REAL, updated REAL, '
+                'full_at REAL)'
+            )
+            columns = {
+                row[1] for row in connection.execute(
+                    'PRAGMA table_info(buckets)'
+                )
+            }
+            if 'full_at' not in columns:
+                connection.execute(
+                    'ALTER TABLE buckets ADD COLUMN full_at REAL'
+                )
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS rejections ('
+                'scope TEXT PRIMARY KEY, count INTEGER, last REAL)'
+            )
+            self.local.connection = connection
+        return connection
+
+    def consume(self, scope, key, capacity, refill):
+        """
+        Списывает токен из бакета. Возвращает (разрешено, сколько
+        секунд ждать следующего токена).
+        """
+        connection = self.connect()
+        now = time.time()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT tokens, updated FROM buckets WHERE key = ?',
+                (f'{scope}:{key}',)
+            ).fetchone()
+            tokens = capacity if row is None else min(
+                capacity, row[0] + (now - row[1]) * refill
+            )
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            else:
+                connection.execute(
+                    'INSERT INTO rejections (scope, count, last) '
+                    'VALUES (?, 1, ?) ON CONFLICT (scope) DO UPDATE '
+                    'SET count = count + 1, last = excluded.last',
+                    (scope, now)
+                )
+            connection.execute(
+                'INSERT OR REPLACE INTO buckets '
+                '(key, tokens, updated, full_at) VALUES (?, ?, ?, ?)',
+                (
+                    f'{scope}:{key}', tokens, now,
+                    now + (capacity - tokens) / refill
+                )
+            )
+            if now - self.pruned >= self.prune_interval:
+                self.pruned = now
+                self.delete_full(connection, now)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return allowed, 0 if allowed else (1 - tokens) / refill
+
+    def delete_full(self, connection, now):
+        return connection.execute(
+            'DELETE FROM buckets WHERE full_at IS NULL OR full_at <= ?',
+            (now,)
+        ).rowcount
+
+    def prune(self):
+        """ Удаляет наполнившиеся бакеты, возвращает их число """
+
+        self.pruned = time.time()
+        return self.delete_full(self.connect(), self.pruned)
+
+    def rejections(self):
+        return {
+            scope: {'count': count, 'last': last}
+            for scope, count, last in self.connect().execute(
+                'SELECT scope, count, last FROM rejections ORDER BY scope'
+            )
+        }
+
+    def reset(self):
+        connection = self.connect()
+        connection.execute('DELETE FROM buckets')
+        connection.execute('DELETE FROM rejections')
+
+
+stores = {}
+stores_lock = threading.Lock()
+
+
+def get_store():
+    """ Хранилище бакетов для файла settings.THROTTLE_DB_PATH """
+
+    path = str(settings.THROTTLE_DB_PATH)
+    with stores_lock:
+        if path not in stores:
+            stores[path] = SQLiteBucketStore(path)
+        return stores[path]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Токен-бакет с частотой из REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+    по scope: '10/min' - до 10 запросов подряд и 10 новых в минуту.
+    Частота None отключает ограничение.
+    """
+
+    scope = None
+
+    def get_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        rate = parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(self.scope))
+        key = self.get_key(request, view)
+        if rate is None or not key:
+            return True
+        allowed, self.wait_seconds = get_store().consume(
+            self.scope, key, *rate
+        )
+        if not allowed:
+            logger.warning('Запрос отклонён: %s %s', self.scope, key)
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+    def get_ident(self, request):
+        """
+        Адрес клиента. X-Forwarded-For учитывается, только если
+        в REST_FRAMEWORK задан NUM_PROXIES: без прокси заголовок
+        подставляет сам клиент и обходит бакет по IP.
+        """
+        if api_settings.NUM_PROXIES is None:
+            return request.META.get('REMOTE_ADDR')
+        return super().get_ident(request)
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    """ Регистрация и получение токена с одного IP """
+
+    scope = 'auth_ip'
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class AuthUsernameThrottle(TokenBucketThrottle):
+    """ Регистрация и подбор кода подтверждения для одного username """
+
+    scope = 'auth_username'
+
+    def get_key(self, request, view):
+        if not isinstance(request.data, dict):
+            return self.get_ident(request)
+        username = request.data.get('username')
+        return username.lower() if isinstance(username, str) else None
@@ -2,9 +2,11 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
 from .views import (
+    AutocompleteAPIView,
     TitleViewSet,
     CategoryViewSet,
     GenreViewSet,
+    LeaderboardAPIView,
     RegisterAPIView,
     TokenAPIView,
     UserViewSet,
@@ -36,5 +38,15 @@ router.register(r"users", UserViewSet)
 urlpatterns = [
     path('v1/auth/signup/', RegisterAPIView.as_view()),
     path('v1/auth/token/', TokenAPIView.as_view()),
+    path(
+        'v1/autocomplete/',
+        AutocompleteAPIView.as_view(),
+        name='autocomplete'
+    ),
+    path(
+        'v1/leaderboards/<str:board>/',
+        LeaderboardAPIView.as_view(),
+        name='leaderboards'
+    ),
     path('v1/', include(router.urls)),
 ]
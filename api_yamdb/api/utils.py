@@ -1,6 +1,5 @@
 from uuid import uuid4
 
-from django.core.mail import send_mail
 from django.conf import settings
 from rest_framework_simplejwt.tokens import RefreshToken
 
@@ -14,14 +13,25 @@ def generate():
 def create_token(user):
     """ Создает токен для пользователя """
 
-    token = RefreshToken.for_user(user)
-    return str(token.access_token)
+    access = RefreshToken.for_user(user).access_token
+    if settings.JWT_RIGHTS_CLAIMS:
+        # Права в токене проверяются без запроса к базе,
+        # token_version отзывает их при смене роли.
+        access['username'] = user.username
+        access['role'] = user.role
+        access['is_staff'] = user.is_staff
+        access['is_superuser'] = user.is_superuser
+        access['token_version'] = user.token_version
+    return str(access)
 
 
 def send_confirmation_code(email, confirmation_code):
-    """ Отправляет код на почту """
+    """ Ставит письмо с кодом в очередь на отправку """
 
-    send_mail(
+    # reviews.models импортирует этот модуль, поэтому импорт здесь.
+    from reviews.outbox import enqueue
+
+    enqueue(
         'Проверочный код',
         confirmation_code,
         settings.EMAIL,
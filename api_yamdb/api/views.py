@@ -1,11 +1,30 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework import status, filters, viewsets, pagination
-
-from .filters import TitleFilter
+from rest_framework.settings import api_settings
+from rest_framework import status, filters, viewsets
+
+from .autocomplete import KINDS, prefix_index
+from .cache import (
+    AUTHORS,
+    COMMENTS,
+    REVIEWS,
+    CachedResponseMixin,
+    ConditionalGetMixin
+)
+from .facets import FacetMixin
+from .filters import SearchLimitMixin, TitleFilter, TitleSearchFilter
+from .pagination import PubDatePagination, TitlePagination
+from .sparse import SparseFieldsMixin
+from .throttling import AuthIPThrottle, AuthUsernameThrottle
+from reviews.leaderboards import GROUPS, LEADERBOARD_SIZE, get_ranking
 from reviews.models import User, Title, Review, Comment, Category, Genre
 from .utils import (
     generate,
@@ -15,13 +34,15 @@ from .utils import (
 from .serializers import (
     GenreSerializer,
     CategorySerializer,
-    TitleGetSerializer,
     TitlePostSerializer,
+    TitleReadSerializer,
     RegisterSerializer,
     UserSerializer,
     TokenSerializer,
     ReviewSerializer,
-    CommentSerializer
+    ReviewReadSerializer,
+    CommentSerializer,
+    CommentReadSerializer
 )
 from .permissions import (
     IsAdmin,
@@ -30,7 +51,8 @@ from .permissions import (
 )
 
 
-class GenreViewSet(viewsets.ModelViewSet):
+class GenreViewSet(ConditionalGetMixin, CachedResponseMixin,
+                   viewsets.ModelViewSet):
     lookup_field = 'slug'
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
@@ -50,7 +72,8 @@ class GenreViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_204_NO_CONTENT)
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, CachedResponseMixin,
+                      viewsets.ModelViewSet):
     lookup_field = 'slug'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
@@ -70,46 +93,112 @@ class CategoryViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_204_NO_CONTENT)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all()
+class TitleViewSet(ConditionalGetMixin, CachedResponseMixin, FacetMixin,
+                   SearchLimitMixin, SparseFieldsMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
+    sparse_columns = {
+        'id': ('id',),
+        'name': ('name',),
+        'year': ('year',),
+        'rating': ('rating_sum', 'rating_count'),
+        'description': ('description',),
+        'genre': (),
+        'category': ('category', 'category__name', 'category__slug'),
+    }
+    sparse_prefetch = {'genre': 'genre'}
     permission_classes = (IsAdminOrReadOnly,)
-    pagination_class = pagination.LimitOffsetPagination
+    pagination_class = TitlePagination
+    filter_backends = (DjangoFilterBackend, TitleSearchFilter)
     filterset_class = TitleFilter
 
     def get_serializer_class(self):
         if self.request.method in ['POST', 'PUT', 'PATCH']:
             return TitlePostSerializer
-        return TitleGetSerializer
+        return TitleReadSerializer
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, SparseFieldsMixin,
+                    viewsets.ModelViewSet):
     """Вьюсет для модели Review."""
     serializer_class = ReviewSerializer
     permission_classes = (ReviewAndCommentPermission,)
+    pagination_class = PubDatePagination
+    sparse_required = ('pub_date',)
+    sparse_columns = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author', 'author__username'),
+        'score': ('score',),
+        'pub_date': ('pub_date',),
+    }
+
+    def get_version_scopes(self):
+        return (REVIEWS.format(self.kwargs.get('title_id')), AUTHORS)
 
     def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+        """Произведение из URL, один запрос на весь запрос клиента."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, id=self.kwargs.get('title_id')
+            )
+        return self._title
 
     def get_queryset(self):
-        return Review.objects.filter(title=self.get_title())
+        return Review.objects.filter(
+            title=self.get_title()
+        ).select_related('author')
+
+    def get_serializer_class(self):
+        if self.action in ('list', 'retrieve'):
+            return ReviewReadSerializer
+        return ReviewSerializer
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, title=self.get_title())
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, SparseFieldsMixin,
+                     viewsets.ModelViewSet):
     """Вьюсет для модели Comment."""
     serializer_class = CommentSerializer
     permission_classes = (ReviewAndCommentPermission,)
+    pagination_class = PubDatePagination
+    sparse_required = ('pub_date',)
+    sparse_columns = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author', 'author__username'),
+        'pub_date': ('pub_date',),
+    }
+
+    def get_version_scopes(self):
+        return (COMMENTS.format(self.kwargs.get('review_id')), AUTHORS)
 
     def get_review(self):
-        return get_object_or_404(Review, id=self.kwargs.get('review_id'))
+        """
+        Отзыв из URL с проверкой, что он относится к произведению
+        из URL. Один запрос на весь запрос клиента.
+        """
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                id=self.kwargs.get('review_id'),
+                title=self.kwargs.get('title_id')
+            )
+        return self._review
 
     def get_queryset(self):
-        review_id = self.kwargs.get("review_id")
-        title_id = self.kwargs.get("title_id")
-        review = get_object_or_404(Review, id=review_id, title=title_id)
-        return Comment.objects.filter(review=review)
+        return Comment.objects.filter(
+            review=self.get_review()
+        ).select_related('author')
+
+    def get_serializer_class(self):
+        if self.action in ('list', 'retrieve'):
+            return CommentReadSerializer
+        return CommentSerializer
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.get_review())
@@ -119,7 +208,7 @@ class RegisterAPIView(APIView):
     """ View для регистрации """
 
     register_serializer = RegisterSerializer
-    user_serializer = UserSerializer
+    throttle_classes = (AuthIPThrottle, AuthUsernameThrottle)
 
     def post(self, request):
         serializer = self.register_serializer(data=request.data)
@@ -129,34 +218,119 @@ class RegisterAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST)
         username = serializer.validated_data.get('username')
         email = serializer.validated_data.get('email')
-        user = User.objects.filter(
-            username=username,
-            email=email
-        ).first()
-        if user:
-            code = user.confirmation_code
-        else:
-            code = generate()
-            data = {
-                'username': username,
-                'email': email,
-                'confirmation_code': code
-            }
-            user = self.user_serializer(data=data)
-            if user.is_valid():
-                user.save()
-            else:
-                return Response(
-                    user.errors,
-                    status=status.HTTP_400_BAD_REQUEST)
+        code = self.get_confirmation_code(username, email)
         send_confirmation_code(email, code)
         return Response(dict(serializer.validated_data))
 
+    def get_confirmation_code(self, username, email):
+        """
+        Новый пользователь - один INSERT, без предварительных проверок.
+        Если INSERT нарушил уникальность, одним запросом выясняется,
+        тот же это пользователь или занят username либо email.
+        """
+        code = generate()
+        try:
+            with transaction.atomic():
+                User.objects.create(
+                    username=username,
+                    email=email,
+                    confirmation_code=code
+                )
+            return code
+        except IntegrityError:
+            pass
+        errors = {}
+        for user in User.objects.filter(
+            Q(username=username) | Q(email=email)
+        ).only('username', 'email', 'confirmation_code'):
+            if user.username == username and user.email == email:
+                return user.confirmation_code
+            if user.username == username:
+                errors['username'] = [
+                    'Пользователь с таким username уже существует'
+                ]
+            if user.email == email:
+                errors['email'] = ['Пользователь с таким email уже существует']
+        raise ValidationError(errors or {
+            api_settings.NON_FIELD_ERRORS_KEY: [
+                'Не удалось зарегистрировать пользователя, повторите запрос'
+            ]
+        })
+
+
+class AutocompleteAPIView(APIView):
+    """
+    Автодополнение по началу слов в названиях произведений,
+    жанров и категорий: ?q=тер&type=title,genre&limit=10
+    """
+
+    max_limit = 50
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        kinds = request.query_params.get('type')
+        kinds = set(kinds.split(',')) & set(KINDS) if kinds else KINDS
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            limit = 10
+        if not query:
+            return Response([])
+        return Response(prefix_index.complete(
+            query, kinds, min(max(limit, 1), self.max_limit)
+        ))
+
+
+class LeaderboardAPIView(APIView):
+    """
+    Готовые рейтинги произведений с байесовской оценкой:
+    /leaderboards/top/?genre=drama или ?category=movie
+    и /leaderboards/trending/ - популярные за последнюю неделю.
+    Отдаётся последний снимок команды rebuild_leaderboards,
+    до первого построения - ответ 503.
+    """
+
+    boards = ('top', 'trending')
+
+    def get_ranking(self, request, board):
+        if board == 'top':
+            for group in GROUPS:
+                slug = request.query_params.get(group)
+                if slug:
+                    return get_ranking(board, group, slug)
+        return get_ranking(board)
+
+    def get(self, request, board):
+        if board not in self.boards:
+            raise Http404
+        try:
+            limit = int(request.query_params.get('limit', LEADERBOARD_SIZE))
+        except ValueError:
+            limit = LEADERBOARD_SIZE
+        ranking = self.get_ranking(request, board)
+        if ranking is None:
+            return Response(
+                {'detail': 'Рейтинги ещё не построены.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        ranking = ranking[:max(limit, 1)]
+        titles = Title.objects.select_related('category').prefetch_related(
+            'genre'
+        ).in_bulk([pk for pk, _ in ranking])
+        result = []
+        for pk, score in ranking:
+            if pk in titles:
+                data = TitleReadSerializer(titles[pk]).data
+                data['score'] = score
+                result.append(data)
+        return Response(result)
+
 
 class TokenAPIView(APIView):
     """ View для создания и отправки токена """
 
     serializer_class = TokenSerializer
+    throttle_classes = (AuthIPThrottle, AuthUsernameThrottle)
 
     def post(self, request):
         serializer = self.serializer_class(data=request.data)
@@ -183,7 +357,7 @@ class TokenAPIView(APIView):
         )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     """
     ViewSet для создания пользователя админом,
     для получчения информации о пользователе по username,
@@ -200,6 +374,11 @@ class UserViewSet(viewsets.ModelViewSet):
     search_fields = ('username',)
     lookup_field = 'username'
     http_method_names = ['get', 'post', 'patch', 'delete']
+    sparse_columns = {
+        name: (name,) for name in (
+            'username', 'email', 'first_name', 'last_name', 'bio', 'role'
+        )
+    }
 
     @action(
         detail=False,
@@ -208,17 +387,20 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=[IsAuthenticated]
     )
     def me_get_patch(self, request):
+        # request.user может быть собран из клеймов токена без полей
+        # профиля, поэтому профиль читается из базы.
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'PATCH':
             serializer = self.get_serializer(
-                request.user,
+                user,
                 data=request.data,
                 partial=True
             )
             if serializer.is_valid(raise_exception=True):
-                serializer.validated_data['role'] = request.user.role
+                serializer.validated_data['role'] = user.role
                 serializer.save()
                 return Response(serializer.data)
             else:
                 return Response(serializer.errors)
-        serializer = self.get_serializer(request.user)
+        serializer = self.get_serializer(user)
         return Response(serializer.data)
@@ -68,6 +68,39 @@ DATABASES = {
     }
 }
 
+# Тела ответов, фасеты и кэш аутентификации. Кэш может быть локальным
+# для процесса: ключи ответов строятся из версий в общей таблице
+# reviews.CacheVersion, поэтому запись в любом процессе сразу делает
+# прежние тела недоступными, а сами они живут не дольше
+# API_CACHE_TIMEOUT.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+API_CACHE_TIMEOUT = 60 * 5
+
+AUTH_USER_CACHE_SIZE = 10000
+AUTH_USER_CACHE_TIMEOUT = 60
+# Сколько секунд процесс доверяет закэшированной token_version.
+# С кэшем в памяти процесса это предел, за который смена роли или
+# удаление пользователя в другом процессе отзывает права из клеймов;
+# с общим CACHE_BACKEND сигнал обновляет значение сразу для всех.
+AUTH_TOKEN_VERSION_TIMEOUT = 5
+
+# Индексы автодополнения и поиска в памяти процесса не чаще чем раз
+# в столько секунд сверяют общую версию каталога и строятся заново
+# после записи в другом процессе.
+INDEX_REFRESH_INTERVAL = 5
+
+# Роль и флаги пользователя в access-токене.
+JWT_RIGHTS_CLAIMS = True
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -90,7 +123,16 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.TokenClaimsAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
@@ -98,8 +140,22 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.'
                                 'PageNumberPagination',
     "PAGE_SIZE": 10,
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': '30/min',
+        'auth_username': '5/min',
+    },
 }
 
+# Токен-бакеты api/throttling.py, файл общий для всех процессов.
+# За обратным прокси задайте REST_FRAMEWORK['NUM_PROXIES'], иначе
+# бакет по IP берёт REMOTE_ADDR и не верит X-Forwarded-For.
+THROTTLE_DB_PATH = os.getenv(
+    'THROTTLE_DB_PATH', str(BASE_DIR / 'throttle.sqlite3')
+)
+# Не чаще чем раз в столько секунд из файла удаляются бакеты,
+# снова наполнившиеся до предела.
+THROTTLE_PRUNE_INTERVAL = 60
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -127,3 +183,8 @@ AUTH_USER_MODEL = 'reviews.User'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 EMAIL = 'test@yandex.ru'
+
+# thread - фоновый поток процесса: стартует с первым запросом
+# и досылает письма, оставшиеся после перезапуска; eager - отправка
+# в запросе; command - только python manage.py run_outbox.
+OUTBOX_MODE = os.getenv('OUTBOX_MODE', 'thread')
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Title, Category, Genre, Review, Comment, User
+from .models import (Title, Category, Genre, Review, Comment, User,
+                     OutgoingMail)
 from django.contrib import admin
 from import_export import resources
 from import_export.admin import ImportExportModelAdmin
@@ -71,9 +72,16 @@ class CommentAdmin(ImportExportModelAdmin):
     list_display = [f.name for f in Comment._meta.fields]
 
 
+class OutgoingMailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'subject', 'recipient', 'created', 'attempts',
+                    'sent_at', 'last_error')
+    list_filter = ('sent_at',)
+
+
 admin.site.register(User, UserAdmin)
 admin.site.register(Title, TitleAdmin)
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Genre, GenreAdmin)
 admin.site.register(Review, ReviewAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(OutgoingMail, OutgoingMailAdmin)
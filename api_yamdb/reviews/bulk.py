@@ -0,0 +1,23 @@
+from contextlib import contextmanager
+
+
+@contextmanager
+def keep_explicit_dates(model, attnames):
+    """
+    Отключает auto_now/auto_now_add у перечисленных полей модели,
+    иначе bulk_create перезапишет переданные даты текущим временем.
+    """
+    fields = [
+        field for field in model._meta.local_fields
+        if field.attname in attnames
+        and (getattr(field, 'auto_now', False)
+             or getattr(field, 'auto_now_add', False))
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
@@ -0,0 +1,114 @@
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, ExpressionWrapper, F, FloatField, Sum
+from django.utils import timezone
+
+from .models import Category, Genre, Leaderboard, Review, Title
+
+GROUPS = ('genre', 'category')
+LEADERBOARD_SIZE = 100
+TRENDING_DAYS = 7
+# Число "виртуальных" оценок, равных средней по каталогу: произведение
+# с одной десяткой не обгонит произведение с сотней девяток.
+PRIOR_WEIGHT = 10
+
+
+def bayesian_score(prior_mean, total, count, prior_weight=PRIOR_WEIGHT):
+    """ (C * m + сумма оценок) / (C + число оценок) """
+
+    return ExpressionWrapper(
+        (F(total) + prior_weight * prior_mean)
+        / (F(count) + float(prior_weight)),
+        output_field=FloatField()
+    )
+
+
+def ranked(queryset, size):
+    return [
+        [pk, round(score, 2)]
+        for pk, score in queryset.values_list('id', 'score')[:size]
+    ]
+
+
+def build_leaderboards(size=LEADERBOARD_SIZE, days=TRENDING_DAYS):
+    """
+    Считает рейтинги по сохранённым сумме и количеству оценок
+    произведений: лучшие в целом, по жанрам и категориям,
+    а также популярные за последние days дней.
+    """
+    totals = Title.objects.aggregate(
+        total=Sum('rating_sum'), count=Sum('rating_count')
+    )
+    mean = totals['total'] / totals['count'] if totals['count'] else 0.0
+    titles = Title.objects.filter(rating_count__gt=0).annotate(
+        score=bayesian_score(mean, 'rating_sum', 'rating_count')
+    ).order_by('-score', 'id')
+
+    trending = Review.objects.filter(
+        pub_date__gte=timezone.now() - timedelta(days=days)
+    ).values('title_id').annotate(
+        recent_total=Sum('score'), recent_count=Count('id')
+    ).annotate(
+        score=bayesian_score(mean, 'recent_total', 'recent_count')
+    ).order_by('-recent_count', '-score', 'title_id')
+
+    return {
+        'built': time.time(),
+        'top': ranked(titles, size),
+        'genre': {
+            slug: ranked(titles.filter(genre__slug=slug), size)
+            for slug in Genre.objects.values_list('slug', flat=True)
+        },
+        'category': {
+            slug: ranked(titles.filter(category__slug=slug), size)
+            for slug in Category.objects.values_list('slug', flat=True)
+        },
+        'trending': [
+            [row['title_id'], round(row['score'], 2)]
+            for row in trending[:size]
+        ],
+    }
+
+
+def leaderboard_rows(leaderboards):
+    built = timezone.now()
+    yield Leaderboard(key='top', ranking=leaderboards['top'], built=built)
+    yield Leaderboard(
+        key='trending', ranking=leaderboards['trending'], built=built
+    )
+    for group in GROUPS:
+        for slug, ranking in leaderboards[group].items():
+            yield Leaderboard(
+                key=f'{group}:{slug}', ranking=ranking, built=built
+            )
+
+
+def rebuild_leaderboards(**kwargs):
+    """
+    Строит рейтинги и заменяет снимок в таблице Leaderboard одной
+    транзакцией: до фиксации запросы читают предыдущий снимок.
+    """
+    leaderboards = build_leaderboards(**kwargs)
+    with transaction.atomic():
+        Leaderboard.objects.all().delete()
+        Leaderboard.objects.bulk_create(leaderboard_rows(leaderboards))
+    return leaderboards
+
+
+def get_ranking(board, group=None, slug=None):
+    """
+    Рейтинг из последнего снимка одним запросом, на месте он
+    не строится. None, если снимка ещё нет; у жанра или категории
+    без оценённых произведений рейтинг пустой.
+    """
+    key = f'{group}:{slug}' if group else board
+    rankings = dict(
+        Leaderboard.objects.filter(key__in={key, board}).values_list(
+            'key', 'ranking'
+        )
+    )
+    if board not in rankings:
+        return None
+    return rankings.get(key, [])
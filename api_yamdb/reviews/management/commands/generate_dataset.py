@@ -0,0 +1,250 @@
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api.cache import bump_all
+from reviews.bulk import keep_explicit_dates
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+WORDS = (
+    'тень', 'город', 'ветер', 'последний', 'тайна', 'дорога', 'ночь',
+    'море', 'звезда', 'война', 'мир', 'сердце', 'огонь', 'зима', 'остров',
+    'время', 'легенда', 'королева', 'шторм', 'песня', 'сад', 'маяк',
+    'shadow', 'city', 'night', 'river', 'empire', 'dream', 'storm',
+    'silent', 'lost', 'golden', 'winter', 'star', 'road', 'legend',
+)
+
+
+def zipf_weights(size, skew):
+    """ Накопленные веса степенного распределения для рангов 1..size """
+
+    return list(accumulate(1 / rank ** skew for rank in range(1, size + 1)))
+
+
+class Command(BaseCommand):
+    """
+    Создаёт синтетические данные для нагрузочных замеров:
+    python manage.py generate_dataset --titles 100000 --reviews 3000000
+    Популярность произведений и активность пользователей подчиняются
+    степенному закону, жанры и категории - закону Ципфа. Вставка идёт
+    через bulk_create одной транзакцией, результат воспроизводим
+    при одинаковом --seed. После фиксации сдвигаются версии кэша
+    ответов.
+    """
+
+    help = 'Создаёт синтетический набор данных заданного размера'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--titles', type=int, default=10000)
+        parser.add_argument(
+            '--reviews', type=int, default=100000,
+            help='Общее количество отзывов'
+        )
+        parser.add_argument(
+            '--comments', type=int, default=100000,
+            help='Общее количество комментариев'
+        )
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Показатель степенного закона популярности'
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        started = time.monotonic()
+        with transaction.atomic():
+            users = self.create_users()
+            categories, genres = self.create_catalog()
+            titles = self.create_titles(categories, genres)
+            reviews = self.create_reviews(titles, users)
+            self.create_comments(reviews, users)
+            Title.objects.refresh_rating()
+        bump_all()
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.monotonic() - started:.1f} с'
+        ))
+
+    def report(self, name, rows, started):
+        elapsed = time.monotonic() - started
+        rate = rows / elapsed if elapsed else rows
+        self.stdout.write(
+            f'{name}: {rows} строк за {elapsed:.1f} с ({rate:.0f} строк/с)'
+        )
+
+    def popular(self, population):
+        """ Выбирает элементы с весами по степенному закону """
+
+        population = list(population)
+        self.random.shuffle(population)
+        weights = zipf_weights(len(population), self.options['skew'])
+        return population, weights
+
+    def bulk_insert(self, model, objs):
+        batch = []
+        for obj in objs:
+            batch.append(obj)
+            if len(batch) == self.batch_size:
+                model.objects.bulk_create(batch)
+                batch = []
+        model.objects.bulk_create(batch)
+
+    def create_users(self):
+        started = time.monotonic()
+        first_id = (User.objects.order_by('-id').values_list(
+            'id', flat=True
+        ).first() or 0) + 1
+        self.bulk_insert(User, (
+            User(
+                username=f'gen_{first_id + i}',
+                email=f'gen_{first_id + i}@yamdb.fake',
+                confirmation_code=f'{self.random.getrandbits(64):x}'
+            )
+            for i in range(self.options['users'])
+        ))
+        self.report('Пользователи', self.options['users'], started)
+        return list(User.objects.filter(
+            id__gte=first_id
+        ).values_list('id', flat=True))
+
+    def create_catalog(self):
+        suffix = self.random.getrandbits(32)
+        Category.objects.bulk_create(
+            Category(name=f'Категория {i}', slug=f'category-{suffix}-{i}')
+            for i in range(self.options['categories'])
+        )
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {i}', slug=f'genre-{suffix}-{i}')
+            for i in range(self.options['genres'])
+        )
+        categories = Category.objects.filter(
+            slug__startswith=f'category-{suffix}-'
+        ).values_list('id', flat=True)
+        genres = Genre.objects.filter(
+            slug__startswith=f'genre-{suffix}-'
+        ).values_list('id', flat=True)
+        return self.popular(categories), self.popular(genres)
+
+    def title_name(self):
+        words = self.random.sample(WORDS, self.random.randint(1, 3))
+        return ' '.join(words).capitalize()
+
+    def create_titles(self, categories, genres):
+        started = time.monotonic()
+        first_id = (Title.objects.order_by('-id').values_list(
+            'id', flat=True
+        ).first() or 0) + 1
+        category_ids, category_weights = categories
+        self.bulk_insert(Title, (
+            Title(
+                name=self.title_name(),
+                year=self.random.randint(1900, 2022),
+                description=' '.join(self.random.choices(WORDS, k=30)),
+                category_id=self.random.choices(
+                    category_ids, cum_weights=category_weights
+                )[0]
+            )
+            for _ in range(self.options['titles'])
+        ))
+        title_ids = list(Title.objects.filter(
+            id__gte=first_id
+        ).values_list('id', flat=True))
+
+        genre_ids, genre_weights = genres
+        links = (
+            Title.genre.through(title_id=title_id, genre_id=genre_id)
+            for title_id in title_ids
+            for genre_id in set(self.random.choices(
+                genre_ids, cum_weights=genre_weights,
+                k=self.random.randint(1, 3)
+            ))
+        )
+        self.bulk_insert(Title.genre.through, links)
+        self.report('Произведения', len(title_ids), started)
+        return title_ids
+
+    def create_reviews(self, title_ids, user_ids):
+        """
+        Пара (произведение, автор) уникальна, поэтому повторы
+        отбрасываются; популярные произведения получают основную
+        часть отзывов, активные пользователи пишут их больше других.
+        """
+        started = time.monotonic()
+        titles, title_weights = self.popular(title_ids)
+        authors, author_weights = self.popular(user_ids)
+        quality = {
+            title_id: self.random.gauss(6.5, 1.5) for title_id in titles
+        }
+        now = timezone.now()
+        seen = set()
+        target = min(self.options['reviews'], len(titles) * len(authors))
+        first_id = (Review.objects.order_by('-id').values_list(
+            'id', flat=True
+        ).first() or 0) + 1
+
+        def reviews():
+            attempts = 0
+            while len(seen) < target and attempts < target * 20:
+                attempts += 1
+                title_id = self.random.choices(
+                    titles, cum_weights=title_weights
+                )[0]
+                author_id = self.random.choices(
+                    authors, cum_weights=author_weights
+                )[0]
+                if (title_id, author_id) in seen:
+                    continue
+                seen.add((title_id, author_id))
+                score = round(self.random.gauss(quality[title_id], 2))
+                yield Review(
+                    title_id=title_id,
+                    author_id=author_id,
+                    text=' '.join(self.random.choices(WORDS, k=40)),
+                    score=min(10, max(1, score)),
+                    pub_date=now - timedelta(
+                        seconds=self.random.expovariate(1 / 86400 / 90)
+                    )
+                )
+
+        with keep_explicit_dates(Review, {'pub_date'}):
+            self.bulk_insert(Review, reviews())
+        self.report('Отзывы', len(seen), started)
+        return list(Review.objects.filter(
+            id__gte=first_id
+        ).values_list('id', flat=True))
+
+    def create_comments(self, review_ids, user_ids):
+        if not review_ids:
+            return
+        started = time.monotonic()
+        reviews, review_weights = self.popular(review_ids)
+        authors, author_weights = self.popular(user_ids)
+        now = timezone.now()
+        with keep_explicit_dates(Comment, {'pub_date'}):
+            self.bulk_insert(Comment, (
+                Comment(
+                    review_id=self.random.choices(
+                        reviews, cum_weights=review_weights
+                    )[0],
+                    author_id=self.random.choices(
+                        authors, cum_weights=author_weights
+                    )[0],
+                    text=' '.join(self.random.choices(WORDS, k=15)),
+                    pub_date=now - timedelta(
+                        seconds=self.random.expovariate(1 / 86400 / 30)
+                    )
+                )
+                for _ in range(self.options['comments'])
+            ))
+        self.report('Комментарии', self.options['comments'], started)
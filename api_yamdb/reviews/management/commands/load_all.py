@@ -0,0 +1,217 @@
+import csv
+import datetime
+import os
+import queue
+import threading
+import time
+from contextlib import ExitStack
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.cache import bump_all
+from reviews.bulk import keep_explicit_dates
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+# Файлы сгруппированы по уровням внешних ключей: файлы одного уровня
+# друг от друга не зависят, каждый следующий уровень ссылается
+# на предыдущие. Словарь переименовывает колонки csv в attname полей.
+LEVELS = (
+    (
+        ('users.csv', User, {}),
+        ('category.csv', Category, {}),
+        ('genre.csv', Genre, {}),
+    ),
+    (
+        ('titles.csv', Title, {'category': 'category_id'}),
+    ),
+    (
+        ('genre_title.csv', Title.genre.through, {}),
+        ('review.csv', Review, {'author': 'author_id'}),
+    ),
+    (
+        ('comments.csv', Comment, {'author': 'author_id'}),
+    ),
+)
+
+DONE = object()
+
+
+def to_python(field, value):
+    if value == '' and field.null:
+        return None
+    value = field.to_python(value)
+    if (settings.USE_TZ and isinstance(value, datetime.datetime)
+            and timezone.is_naive(value)):
+        value = timezone.make_aware(value, timezone.utc)
+    return value
+
+
+def iter_batches(path, model, renames, batch_size):
+    """ Потоково читает csv и отдаёт пачки несохранённых объектов """
+
+    with open(path, encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        columns = [renames.get(name, name) for name in reader.fieldnames]
+        fields = [model._meta.get_field(name) for name in columns]
+        while True:
+            rows = list(islice(reader, batch_size))
+            if not rows:
+                return
+            yield [
+                model(**{
+                    field.attname: to_python(field, value)
+                    for field, value in zip(fields, row.values())
+                })
+                for row in rows
+            ]
+
+
+class Command(BaseCommand):
+    """
+    Загружает все csv из static/data в порядке внешних ключей:
+    пользователи, категории, жанры -> произведения ->
+    связи с жанрами, отзывы -> комментарии.
+    python manage.py load_all --batch-size 5000 --parallel --dry-run
+    Вставка идёт через bulk_create одной транзакцией, проверка внешних
+    ключей откладывается до конца загрузки. После фиксации
+    сдвигаются версии кэша ответов: сигналы при вставке не работают.
+    """
+
+    help = 'Загружает все csv-файлы из static/data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Количество строк в одной пачке вставки'
+        )
+        parser.add_argument(
+            '--path',
+            default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Каталог с csv-файлами'
+        )
+        parser.add_argument(
+            '--parallel',
+            action='store_true',
+            help='Читать независимые файлы одного уровня параллельно'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Загрузить и откатить транзакцию, только отчёт'
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.path = options['path']
+        self.stats = {}
+        started = time.monotonic()
+
+        with ExitStack() as stack:
+            for level in LEVELS:
+                for name, model, renames in level:
+                    stack.enter_context(keep_explicit_dates(
+                        model, self.columns(name, renames)
+                    ))
+            stack.enter_context(transaction.atomic())
+            stack.enter_context(connection.constraint_checks_disabled())
+            for level in LEVELS:
+                if options['parallel'] and len(level) > 1:
+                    self.load_parallel(level)
+                else:
+                    for spec in level:
+                        self.load_file(spec)
+            self.finish()
+            if options['dry_run']:
+                transaction.set_rollback(True)
+        if not options['dry_run']:
+            bump_all()
+
+        total = sum(rows for rows, _ in self.stats.values())
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{"Пробный запуск" if options["dry_run"] else "Загружено"}: '
+            f'{total} строк за {elapsed:.2f} с '
+            f'({total / elapsed if elapsed else total:.0f} строк/с)'
+        ))
+
+    def batches(self, spec):
+        name, model, renames = spec
+        return iter_batches(
+            os.path.join(self.path, name), model, renames, self.batch_size
+        )
+
+    def columns(self, name, renames):
+        path = os.path.join(self.path, name)
+        with open(path, encoding='utf-8', newline='') as f:
+            header = next(csv.reader(f))
+        return {renames.get(name, name) for name in header}
+
+    def insert(self, spec, objs):
+        name, model, _ = spec
+        model.objects.bulk_create(objs, batch_size=self.batch_size)
+        rows, elapsed = self.stats.get(name, (0, 0.0))
+        self.stats[name] = (rows + len(objs), elapsed)
+
+    def load_file(self, spec):
+        started = time.monotonic()
+        for objs in self.batches(spec):
+            self.insert(spec, objs)
+        self.report(spec, time.monotonic() - started)
+
+    def load_parallel(self, level):
+        """
+        Файлы одного уровня читаются и разбираются в отдельных потоках,
+        вставка идёт из основного потока: у SQLite один писатель,
+        а соединение с базой не должно переходить между потоками.
+        """
+        batches = queue.Queue(maxsize=len(level) * 2)
+
+        def produce(spec):
+            try:
+                for objs in self.batches(spec):
+                    batches.put((spec, objs))
+            except Exception as error:
+                batches.put((spec, error))
+            finally:
+                batches.put((spec, DONE))
+
+        started = time.monotonic()
+        for spec in level:
+            threading.Thread(target=produce, args=(spec,), daemon=True).start()
+        running = len(level)
+        while running:
+            spec, objs = batches.get()
+            if objs is DONE:
+                running -= 1
+                self.report(spec, time.monotonic() - started)
+            elif isinstance(objs, Exception):
+                raise objs
+            else:
+                self.insert(spec, objs)
+
+    def finish(self):
+        models = [model for level in LEVELS for _, model, _ in level]
+        connection.check_constraints(
+            table_names=[model._meta.db_table for model in models]
+        )
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for sql in sequence_sql:
+                cursor.execute(sql)
+        Title.objects.refresh_rating()
+
+    def report(self, spec, elapsed):
+        name = spec[0]
+        rows, _ = self.stats.get(name, (0, 0.0))
+        self.stats[name] = (rows, elapsed)
+        rate = rows / elapsed if elapsed else rows
+        self.stdout.write(
+            f'{name}: {rows} строк за {elapsed:.2f} с ({rate:.0f} строк/с)'
+        )
@@ -1,33 +1,88 @@
 import csv
 import os
+import time
+from itertools import islice
+
 from django.conf import settings
 from django.core.management.base import BaseCommand
-from reviews.models import Title, Genre
+from django.db import transaction
+
+from api.cache import bump_all
+from reviews.models import Genre, Title
 
 name_file = 'genre_title.csv'
 
 
 class Command(BaseCommand):
-    """ Возможно загрузить в базу данных тестовые данные командой: """
-    """ python manage.py load_imp (по имени файла)"""
-    """ для обычного импорта испульзуется метод встроенный в панель админа """
-    """ данный скрипт использутся для импорта ManyToManyField """
-    """ импорт происходит из папки static/data """
-    """ важно знать порядок полей в вашей таблице в БД и в том же порядке """
-    """ расположить модели в коде и таблице"""
+    """
+    Загружает связи произведений с жанрами (ManyToManyField)
+    из static/data/genre_title.csv:
+    python manage.py load_imp --batch-size 10000
+    Файл читается потоково, идентификаторы проверяются пачками,
+    строки вставляются через bulk_create в промежуточную таблицу
+    одной транзакцией, после неё сдвигаются версии кэша ответов.
+    Для обычного импорта используется встроенный в панель админа импорт.
+    """
+
+    help = 'Загружает связи произведений с жанрами из genre_title.csv'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Количество строк в одной пачке вставки'
+        )
+        parser.add_argument(
+            '--path',
+            default=os.path.join(
+                settings.BASE_DIR, 'static', 'data', name_file
+            ),
+            help='Путь к csv-файлу'
+        )
 
     def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        through = Title.genre.through
+        genre_ids = set(Genre.objects.values_list('id', flat=True))
+        processed = skipped = 0
+        started = time.monotonic()
 
-        files = os.path.join(settings.BASE_DIR, 'data', name_file)
-
-        with open(files) as f:
-            reader = csv.reader(f)
-            first_line = 1
-            for row in reader:
-                if first_line:
-                    first_line = 0
-                    continue
-                _, created = Title.objects.get(id=row[1]).genre.add(
-                    Genre.objects.get(id=row[2])
+        with open(options['path'], encoding='utf-8', newline='') as f, \
+                transaction.atomic():
+            reader = csv.DictReader(f)
+            while True:
+                rows = list(islice(reader, batch_size))
+                if not rows:
+                    break
+                title_ids = set(Title.objects.filter(
+                    id__in={int(row['title_id']) for row in rows}
+                ).values_list('id', flat=True))
+                links = [
+                    through(
+                        title_id=int(row['title_id']),
+                        genre_id=int(row['genre_id'])
+                    )
+                    for row in rows
+                    if int(row['title_id']) in title_ids
+                    and int(row['genre_id']) in genre_ids
+                ]
+                through.objects.bulk_create(
+                    links, batch_size=batch_size, ignore_conflicts=True
                 )
-            f.close()
+                processed += len(rows)
+                skipped += len(rows) - len(links)
+                self.report(processed, started)
+        bump_all()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: обработано {processed} строк, '
+            f'пропущено {skipped} (нет произведения или жанра)'
+        ))
+
+    def report(self, processed, started):
+        elapsed = time.monotonic() - started
+        rate = processed / elapsed if elapsed else processed
+        self.stdout.write(
+            f'{processed} строк за {elapsed:.1f} с ({rate:.0f} строк/с)'
+        )
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.leaderboards import (LEADERBOARD_SIZE, TRENDING_DAYS,
+                                  rebuild_leaderboards)
+
+
+class Command(BaseCommand):
+    """
+    Пересчитывает рейтинги лучших и популярных произведений:
+    python manage.py rebuild_leaderboards
+    С --interval работает как планировщик и обновляет их каждые N секунд.
+    """
+
+    help = 'Пересчитывает рейтинги лучших и популярных произведений'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=LEADERBOARD_SIZE,
+            help='Число произведений в каждом рейтинге'
+        )
+        parser.add_argument(
+            '--days', type=int, default=TRENDING_DAYS,
+            help='За сколько дней считать популярные произведения'
+        )
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Обновлять каждые N секунд (0 - один раз)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            leaderboards = rebuild_leaderboards(
+                size=options['size'], days=options['days']
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'Рейтинги обновлены за {time.monotonic() - started:.2f} с: '
+                f'{len(leaderboards["top"])} в общем, '
+                f'{len(leaderboards["genre"])} жанров, '
+                f'{len(leaderboards["category"])} категорий, '
+                f'{len(leaderboards["trending"])} популярных'
+            ))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
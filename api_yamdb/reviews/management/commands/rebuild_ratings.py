@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.cache import bump_all
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    """
+    Пересчитывает сохранённый рейтинг всех произведений с нуля:
+    python manage.py rebuild_ratings
+    Нужен после массовой загрузки отзывов в обход сигналов.
+    После пересчёта сдвигает версии кэша ответов.
+    """
+
+    help = 'Пересчитывает rating_sum и rating_count у всех произведений'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = Title.objects.refresh_rating()
+        bump_all()
+        self.stdout.write(
+            self.style.SUCCESS(f'Рейтинг пересчитан у {updated} произведений')
+        )
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.outbox import BATCH_SIZE, dispatch_all
+
+
+class Command(BaseCommand):
+    """
+    Отправляет письма из очереди пачками через одно соединение:
+    python manage.py run_outbox --interval 5
+    Без --interval отправляет всё готовое и завершается.
+    """
+
+    help = 'Отправляет письма из очереди исходящих'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Писем на одно соединение'
+        )
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Проверять очередь каждые N секунд (0 - один проход)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent = dispatch_all(options['batch_size'])
+            if sent:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Отправлено писем: {sent}'
+                ))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
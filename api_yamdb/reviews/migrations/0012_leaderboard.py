@@ -0,0 +1,25 @@
+# Generated by Django 3.2 on 2026-10-18 05:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_cacheversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Leaderboard',
+            fields=[
+                ('key', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('ranking', models.JSONField(default=list, verbose_name='Рейтинг')),
+                ('built', models.DateTimeField(verbose_name='Построен')),
+            ],
+            options={
+                'verbose_name': 'Рейтинг',
+                'verbose_name_plural': 'Рейтинги',
+            },
+        ),
+    ]
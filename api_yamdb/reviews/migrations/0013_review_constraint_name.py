@@ -0,0 +1,21 @@
+# Generated by Django 3.2 on 2026-10-18 05:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_leaderboard'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='review',
+            name='Одно произведение- один отзыв одному автору',
+        ),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('title', 'author'), name='Одно произведение - один отзыв одному автору'),
+        ),
+    ]
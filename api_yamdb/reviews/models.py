@@ -1,8 +1,10 @@
 from django.utils import timezone
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 
 from api.utils import generate
 
@@ -23,6 +25,9 @@ class Genre(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name'], name='genre_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -34,11 +39,33 @@ class Category(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name'], name='category_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class TitleQuerySet(models.QuerySet):
+
+    def refresh_rating(self):
+        """Пересчитывает сохранённый рейтинг произведений по отзывам."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        return self.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('id')).values('total')),
+                0
+            )
+        )
+
+
 class Title(models.Model):
     name = models.CharField('Название', max_length=256)
     description = models.TextField('Описание')
@@ -58,10 +85,35 @@ class Title(models.Model):
         blank=True,
         verbose_name="Жанр"
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок',
+        default=0,
+        editable=False
+    )
+
+    objects = TitleQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['name'], name='title_name_idx'),
+            models.Index(fields=['year'], name='title_year_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        """Средняя оценка, округлённая до десятых."""
+        if not self.rating_count:
+            return None
+        return round(self.rating_sum / self.rating_count, 1)
+
 
 class User(AbstractUser):
     """ Модель пользователя """
@@ -96,6 +148,14 @@ class User(AbstractUser):
         unique=True,
         verbose_name='Email'
     )
+    token_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия прав в токенах'
+    )
+
+    # Изменение этих полей увеличивает token_version.
+    TOKEN_FIELDS = ('role', 'is_staff', 'is_superuser', 'is_active')
 
     @property
     def is_moderator(self):
@@ -105,6 +165,16 @@ class User(AbstractUser):
     def is_admin(self):
         return self.is_staff or self.role == self.ADMIN
 
+    def save(self, *args, update_fields=None, **kwargs):
+        # Сигнал pre_save увеличивает token_version при смене прав;
+        # при сохранении отдельных полей новая версия иначе не попала бы
+        # в базу и старые токены снова приняли бы после истечения кэша.
+        if update_fields is not None and set(update_fields) & set(
+            self.TOKEN_FIELDS
+        ):
+            update_fields = {*update_fields, 'token_version'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -145,6 +215,12 @@ class Review(models.Model):
                 name='Одно произведение - один отзыв одному автору'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            )
+        ]
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         ordering = ('-pub_date',)
@@ -152,6 +228,13 @@ class Review(models.Model):
     def __str__(self):
         return self.text
 
+    def save(self, *args, **kwargs):
+        # Рейтинг произведения сдвигается сигналом post_save: в одной
+        # транзакции с отзывом он и сбросы кэша после фиксации не зависят
+        # от порядка обработчиков.
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     """Модель комментариев к отзывам."""
@@ -173,9 +256,84 @@ class Comment(models.Model):
     )
 
     class Meta:
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            )
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('-pub_date',)
 
     def __str__(self):
         return self.text
+
+
+class OutgoingMail(models.Model):
+    """
+    Письмо в очереди на отправку. Запрос только сохраняет строку,
+    отправляет фоновый обработчик из reviews/outbox.py.
+    """
+    subject = models.CharField(max_length=256, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст письма')
+    from_email = models.CharField(max_length=254, verbose_name='Отправитель')
+    recipient = models.EmailField(max_length=254, verbose_name='Получатель')
+    created = models.DateTimeField(auto_now_add=True)
+    next_attempt = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Следующая попытка'
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    claim = models.CharField(max_length=32, blank=True, default='')
+    last_error = models.TextField(blank=True, default='')
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['sent_at', 'next_attempt'],
+                name='outbox_pending_idx'
+            )
+        ]
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+
+    def __str__(self):
+        return f'{self.subject} -> {self.recipient}'
+
+
+class CacheVersion(models.Model):
+    """
+    Версия области кэша API. Таблица общая для всех процессов,
+    поэтому запись в одном процессе сразу меняет ключи кэша
+    и ETag в остальных. См. api/cache.py.
+    """
+    scope = models.CharField(max_length=64, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Версия кэша'
+        verbose_name_plural = 'Версии кэша'
+
+    def __str__(self):
+        return f'{self.scope}: {self.version}'
+
+
+class Leaderboard(models.Model):
+    """
+    Готовый рейтинг произведений: top, trending, genre:<slug>
+    или category:<slug>. Строки пишет команда rebuild_leaderboards,
+    запрос только читает последний снимок. См. reviews/leaderboards.py.
+    """
+    key = models.CharField(max_length=64, primary_key=True)
+    ranking = models.JSONField(default=list, verbose_name='Рейтинг')
+    built = models.DateTimeField(verbose_name='Построен')
+
+    class Meta:
+        verbose_name = 'Рейтинг'
+        verbose_name_plural = 'Рейтинги'
+
+    def __str__(self):
+        return self.key
@@ -0,0 +1,168 @@
+import logging
+import threading
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import OutgoingMail
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+RETRY_DELAY = timedelta(seconds=30)
+# На это время письма пачки закрепляются за обработчиком,
+# чтобы параллельный обработчик не отправил их второй раз.
+LEASE = timedelta(minutes=5)
+POLL_INTERVAL = 30
+
+
+def enqueue(subject, body, from_email, recipients):
+    """
+    Ставит письма в очередь одним INSERT и будит обработчик после
+    фиксации транзакции. Режим задаёт settings.OUTBOX_MODE:
+    thread - поток в процессе, eager - сразу в текущем потоке,
+    command - только команда run_outbox.
+    """
+    messages = [
+        OutgoingMail(
+            subject=subject,
+            body=body,
+            from_email=from_email,
+            recipient=recipient
+        )
+        for recipient in recipients
+    ]
+    # bulk_create открывает транзакцию, одному письму хватит INSERT.
+    if len(messages) == 1:
+        messages[0].save(force_insert=True)
+    else:
+        OutgoingMail.objects.bulk_create(messages)
+    mode = settings.OUTBOX_MODE
+    if mode == 'eager':
+        transaction.on_commit(dispatch_pending)
+    elif mode == 'thread':
+        transaction.on_commit(worker.wake)
+
+
+def claim_batch(batch_size):
+    """ Закрепляет за вызовом пачку писем, которые пора отправить """
+
+    now = timezone.now()
+    token = uuid4().hex
+    pending = OutgoingMail.objects.filter(
+        sent_at__isnull=True,
+        next_attempt__lte=now,
+        attempts__lt=MAX_ATTEMPTS
+    )
+    ids = list(
+        pending.order_by('next_attempt').values_list('id', flat=True)[
+            :batch_size
+        ]
+    )
+    if not ids:
+        return []
+    pending.filter(id__in=ids).update(claim=token, next_attempt=now + LEASE)
+    return list(OutgoingMail.objects.filter(claim=token).order_by('id'))
+
+
+def dispatch_pending(batch_size=BATCH_SIZE):
+    """
+    Отправляет пачку писем через одно SMTP-соединение. Неудачные
+    письма откладываются с растущей паузой, после MAX_ATTEMPTS
+    попыток остаются в таблице с текстом последней ошибки.
+    Возвращает число отправленных писем.
+    """
+    messages = claim_batch(batch_size)
+    if not messages:
+        return 0
+    sent, failed = [], []
+    try:
+        with get_connection(fail_silently=False) as connection:
+            for message in messages:
+                try:
+                    EmailMessage(
+                        message.subject,
+                        message.body,
+                        message.from_email,
+                        [message.recipient],
+                        connection=connection
+                    ).send()
+                    sent.append(message.id)
+                except Exception as exc:
+                    failed.append((message, exc))
+    except Exception as exc:
+        failed.extend(
+            (message, exc) for message in messages
+            if message.id not in sent
+        )
+    OutgoingMail.objects.filter(id__in=sent).update(
+        sent_at=timezone.now(), claim=''
+    )
+    now = timezone.now()
+    for message, exc in failed:
+        logger.warning('Письмо %s не отправлено: %s', message.id, exc)
+        message.attempts += 1
+        message.next_attempt = now + RETRY_DELAY * 2 ** message.attempts
+        message.last_error = str(exc)
+        message.claim = ''
+    OutgoingMail.objects.bulk_update(
+        [message for message, _ in failed],
+        ('attempts', 'next_attempt', 'last_error', 'claim')
+    )
+    return len(sent)
+
+
+def dispatch_all(batch_size=BATCH_SIZE):
+    """ Отправляет пачки, пока в очереди есть готовые письма """
+
+    total = 0
+    while True:
+        sent = dispatch_pending(batch_size)
+        total += sent
+        if not sent:
+            return total
+
+
+class OutboxWorker:
+    """
+    Фоновый поток процесса: запускается первым запросом к процессу
+    и сразу отправляет оставшиеся в очереди письма, дальше просыпается
+    при постановке письма в очередь и раз в POLL_INTERVAL секунд
+    для повторных попыток.
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name='outbox', daemon=True
+                )
+                self.thread.start()
+
+    def wake(self):
+        self.start()
+        self.event.set()
+
+    def run(self):
+        while True:
+            try:
+                dispatch_all()
+            except Exception:
+                logger.exception('Ошибка обработчика очереди писем')
+            finally:
+                close_old_connections()
+            self.event.wait(POLL_INTERVAL)
+            self.event.clear()
+
+
+worker = OutboxWorker()
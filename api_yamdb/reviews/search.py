@@ -0,0 +1,157 @@
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+from django.db import connection
+
+from api.cache import CATALOG, VersionWatcher
+
+from .models import Title
+
+FTS_TABLE = 'reviews_title_fts'
+TOKEN_RE = re.compile(r'\w+')
+# Совпадение в названии весит больше, чем в описании.
+NAME_WEIGHT = 10.0
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.casefold())
+
+
+class SQLiteFTSIndex:
+    """ Поиск по таблице FTS5, ранжирование bm25 средствами SQLite """
+
+    def search(self, query, limit):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        match = ' '.join(f'"{term}"' for term in terms)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}, %s, 1.0) LIMIT %s',
+                [match, NAME_WEIGHT, limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class InvertedIndex:
+    """
+    Инвертированный индекс в памяти процесса для баз без FTS5.
+    Строится при первом поиске, дальше обновляется сигналами
+    сохранения и удаления произведений; после записи в другом
+    процессе (сдвиг общей версии CATALOG) строится заново.
+    Ранжирование - BM25.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self.watcher = VersionWatcher(CATALOG)
+        self.lock = threading.Lock()
+        self.invalidate()
+
+    def invalidate(self):
+        with self.lock:
+            self.built = False
+            self.postings = defaultdict(dict)
+            self.terms = {}
+            self.lengths = {}
+
+    def build(self):
+        with self.lock:
+            if self.built:
+                return
+            titles = Title.objects.values_list(
+                'id', 'name', 'description'
+            ).iterator()
+            for title_id, name, description in titles:
+                self._add(title_id, name, description)
+            self.built = True
+
+    def _add(self, doc_id, name, description):
+        name_tokens = tokenize(name)
+        frequencies = Counter(tokenize(description))
+        for term in name_tokens:
+            frequencies[term] += NAME_WEIGHT
+        self.lengths[doc_id] = sum(frequencies.values())
+        self.terms[doc_id] = set(frequencies)
+        for term, frequency in frequencies.items():
+            self.postings[term][doc_id] = frequency
+
+    def _remove(self, doc_id):
+        self.lengths.pop(doc_id, None)
+        for term in self.terms.pop(doc_id, ()):
+            documents = self.postings[term]
+            del documents[doc_id]
+            if not documents:
+                del self.postings[term]
+
+    def update(self, title):
+        if not self.built:
+            return
+        with self.lock:
+            self._remove(title.id)
+            self._add(title.id, title.name, title.description)
+
+    def remove(self, title_id):
+        if not self.built:
+            return
+        with self.lock:
+            self._remove(title_id)
+
+    def search(self, query, limit):
+        if self.watcher.changed():
+            self.invalidate()
+        self.build()
+        terms = set(tokenize(query))
+        with self.lock:
+            if not terms or any(term not in self.postings for term in terms):
+                return []
+            total = len(self.lengths)
+            average = sum(self.lengths.values()) / total
+            candidates = set.intersection(
+                *(set(self.postings[term]) for term in terms)
+            )
+            scores = Counter()
+            for term in terms:
+                documents = self.postings[term]
+                idf = math.log(
+                    1 + (total - len(documents) + 0.5)
+                    / (len(documents) + 0.5)
+                )
+                for doc_id in candidates:
+                    frequency = documents[doc_id]
+                    norm = self.k1 * (
+                        1 - self.b + self.b * self.lengths[doc_id] / average
+                    )
+                    scores[doc_id] += (
+                        idf * frequency * (self.k1 + 1) / (frequency + norm)
+                    )
+        return [doc_id for doc_id, _ in scores.most_common(limit)]
+
+
+python_index = InvertedIndex()
+fts_tables = {}
+
+
+def has_fts_table():
+    """ Наличие таблицы проверяется один раз для каждой базы """
+
+    name = connection.settings_dict['NAME']
+    if name not in fts_tables:
+        fts_tables[name] = (
+            connection.vendor == 'sqlite'
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+    return fts_tables[name]
+
+
+def get_search_index():
+    """ FTS5, если таблицу создала миграция, иначе индекс в памяти """
+
+    if has_fts_table():
+        return SQLiteFTSIndex()
+    return python_index
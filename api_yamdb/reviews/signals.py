@@ -0,0 +1,111 @@
+from django.conf import settings
+from django.core.signals import request_started
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from . import outbox
+from .models import Review, Title, User
+from .search import python_index
+
+
+def shift_rating(title_id, score, count):
+    """ Атомарно сдвигает сохранённый рейтинг произведения """
+
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') + score,
+        rating_count=F('rating_count') + count
+    )
+
+
+def refresh_rating(title_id):
+    Title.objects.filter(pk=title_id).refresh_rating()
+
+
+@receiver(post_init, sender=Review)
+def remember_review_score(sender, instance, **kwargs):
+    """
+    Запоминает оценку, с которой отзыв был загружен. У отзыва,
+    загруженного через .only() без оценки, снимка нет: обращение
+    к отложенному полю здесь снова создало бы объект.
+    """
+    deferred = instance.get_deferred_fields()
+    instance._rating_snapshot = (
+        None if {'title_id', 'score'} & deferred
+        else (instance.title_id, instance.score)
+    )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    if instance._rating_snapshot is None and not created:
+        refresh_rating(instance.title_id)
+        instance._rating_snapshot = (instance.title_id, instance.score)
+        return
+    old_title_id, old_score = instance._rating_snapshot or (None, None)
+    if created:
+        shift_rating(instance.title_id, instance.score, 1)
+    elif old_title_id != instance.title_id:
+        shift_rating(old_title_id, -old_score, -1)
+        shift_rating(instance.title_id, instance.score, 1)
+    elif old_score != instance.score:
+        shift_rating(instance.title_id, instance.score - old_score, 0)
+    instance._rating_snapshot = (instance.title_id, instance.score)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    if instance._rating_snapshot is None:
+        refresh_rating(instance.title_id)
+        return
+    old_title_id, old_score = instance._rating_snapshot
+    shift_rating(old_title_id, -old_score, -1)
+
+
+@receiver(post_init, sender=User)
+def remember_user_rights(sender, instance, **kwargs):
+    """ Запоминает роль и флаги, с которыми пользователь был загружен """
+
+    instance._rights_snapshot = (
+        None if set(User.TOKEN_FIELDS) & instance.get_deferred_fields()
+        else tuple(getattr(instance, name) for name in User.TOKEN_FIELDS)
+    )
+
+
+@receiver(pre_save, sender=User)
+def bump_token_version(sender, instance, update_fields=None, **kwargs):
+    """
+    Права в выданных токенах устаревают при смене роли или флагов:
+    токен с прежней token_version проверяется по базе. Сохранение
+    отдельных полей без полей прав версию не меняет.
+    """
+    if instance._state.adding or (
+        update_fields is not None and 'token_version' not in update_fields
+    ):
+        return
+    rights = tuple(getattr(instance, name) for name in User.TOKEN_FIELDS)
+    if rights != instance._rights_snapshot:
+        instance.token_version += 1
+        instance._rights_snapshot = rights
+
+
+@receiver(post_save, sender=Title)
+def update_search_index(sender, instance, **kwargs):
+    python_index.update(instance)
+
+
+@receiver(post_delete, sender=Title)
+def remove_from_search_index(sender, instance, **kwargs):
+    python_index.remove(instance.id)
+
+
+@receiver(request_started)
+def start_outbox_worker(sender, **kwargs):
+    """
+    Письма, оставшиеся в очереди после перезапуска, уходят с первым
+    запросом к процессу, а не со следующей регистрацией. Поток
+    запускается не в ready(): там он работал бы и в migrate, и в shell.
+    """
+    if settings.OUTBOX_MODE == 'thread':
+        outbox.worker.start()
@@ -0,0 +1,20 @@
+import pytest
+from django.core.cache import cache
+
+from api.authentication import user_cache
+from api.autocomplete import prefix_index
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    База очищается между тестами без сигналов моделей,
+    поэтому кэш и индексы в памяти сбрасываются вручную.
+    """
+    cache.clear()
+    prefix_index.invalidate()
+    user_cache.invalidate()
+    yield
+    cache.clear()
+    prefix_index.invalidate()
+    user_cache.invalidate()
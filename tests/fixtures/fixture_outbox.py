@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def eager_outbox(settings):
+    """ Письма отправляются в самом запросе, чтобы тесты видели mail.outbox """
+    settings.OUTBOX_MODE = 'eager'
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def throttle_store(settings, tmp_path):
+    """ Свои токен-бакеты на каждый тест """
+    settings.THROTTLE_DB_PATH = tmp_path / 'throttle.sqlite3'
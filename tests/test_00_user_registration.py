@@ -4,6 +4,7 @@ import pytest
 from django.core import mail
 from django.db.utils import IntegrityError
 
+from reviews.models import User
 from tests.utils import (invalid_data_for_user_patch_and_creation,
                          invalid_data_for_username_and_email_fields)
 
@@ -373,3 +374,36 @@ class Test00UserRegistration:
             'пользователя, созданного администратором,  возвращает ответ '
             'со статусом 200.'
         )
+
+    def test_signup_single_insert(self, client, settings,
+                                  django_assert_num_queries):
+        settings.OUTBOX_MODE = 'command'
+        url = '/api/v1/auth/signup/'
+        data = {'username': 'burst', 'email': 'burst@yamdb.fake'}
+        # BEGIN, вставка пользователя и письма в очередь.
+        with django_assert_num_queries(3):
+            response = client.post(url, data=data)
+        assert response.status_code == HTTPStatus.OK
+        # BEGIN, неудачная вставка, поиск существующего пользователя,
+        # письмо.
+        with django_assert_num_queries(4):
+            response = client.post(url, data=data)
+        assert response.status_code == HTTPStatus.OK
+
+        response = client.post(
+            url, data={'username': 'burst', 'email': 'other@yamdb.fake'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert list(response.json()) == ['username'], (
+            'Проверьте, что при занятом username регистрация возвращает '
+            'ошибку поля `username`.'
+        )
+
+        response = client.post(
+            url, data={'username': 'bad name!', 'email': 'bad@yamdb.fake'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что регистрация проверяет весь username, '
+            'а не только его начало.'
+        )
+        assert not User.objects.filter(email='bad@yamdb.fake').exists()
@@ -1,8 +1,14 @@
 from http import HTTPStatus
 
 import pytest
-
-from tests.utils import (check_pagination,
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from api.authentication import user_cache
+from api.utils import create_token
+from reviews.models import User
+from tests.utils import (check_pagination, create_single_review,
+                         create_titles,
                          invalid_data_for_user_patch_and_creation)
 
 
@@ -552,3 +558,69 @@ class Test01UserAPI:
             'Проверьте, что PATCH-запрос к `/api/v1/users/me/` с ключом '
             '`role` не изменяет роль пользователя.'
         )
+
+    def test_11_01_authenticated_user_cache(self, admin_client, user_client,
+                                            user, django_assert_num_queries):
+        url = '/api/v1/users/'
+        user_client.get(url)
+        with django_assert_num_queries(0):
+            response = user_client.get(url)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert user_client.get(url).status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение пользователя сбрасывает его запись '
+            'в кэше аутентификации.'
+        )
+
+    def test_11_02_rights_claims_in_token(self, admin_client, user,
+                                          django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {create_token(user)}')
+        url = '/api/v1/users/'
+        client.get(url)
+        # Права из клеймов токена, версия токена - из кэша.
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        response = create_single_review(client, titles[0]['id'], 'text', 5)
+        assert response.json()['author'] == user.username
+
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert client.get(url).status_code == HTTPStatus.OK, (
+            'Проверьте, что после смены роли старый токен проверяется '
+            'по базе.'
+        )
+        response = client.get('/api/v1/users/me/')
+        assert response.json()['email'] == user.email
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        response = client.post(
+            '/api/v1/categories/', data={'name': 'Эссе', 'slug': 'essay'}
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен удалённого пользователя больше не '
+            'проходит аутентификацию.'
+        )
+
+    def test_11_03_rights_saved_with_update_fields(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {create_token(user)}')
+        user.role = User.ADMIN
+        user.save(update_fields=['role'])
+        assert User.objects.get(pk=user.pk).token_version == 1
+        cache.clear()
+        user_cache.invalidate()
+        assert client.get('/api/v1/users/').status_code == HTTPStatus.OK, (
+            'Проверьте, что save(update_fields=...) с полями прав '
+            'сохраняет новую token_version.'
+        )
@@ -2,6 +2,8 @@ from http import HTTPStatus
 
 import pytest
 
+from api.cache import CATALOG, bump_version
+from reviews.models import Genre
 from tests.utils import (check_name_and_slug_patterns, check_pagination,
                          check_permissions, create_genre)
 
@@ -122,3 +124,35 @@ class Test03GenreAPI:
                           HTTPStatus.FORBIDDEN)
         check_permissions(moderator_client, url, data, 'модератора',
                           genres, HTTPStatus.FORBIDDEN)
+
+    def test_06_anonymous_response_cache(self, admin_client, client,
+                                         django_assert_num_queries):
+        genres = create_genre(admin_client)
+        url = '/api/v1/genres/'
+        client.get(url)
+        # Только общие для всех процессов версии кэша.
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        assert response.json()['count'] == len(genres), (
+            f'Проверьте, что повторный GET-запрос к `{url}` отдаётся из кэша.'
+        )
+
+        admin_client.post(url, data={'name': 'Вестерн', 'slug': 'western'})
+        response = client.get(url)
+        assert response.json()['count'] == len(genres) + 1, (
+            f'Проверьте, что после изменения жанров кэш `{url}` сбрасывается.'
+        )
+
+    def test_07_response_cache_follows_shared_versions(self, admin_client,
+                                                       client):
+        genres = create_genre(admin_client)
+        url = '/api/v1/genres/'
+        client.get(url)
+        # Запись в другом процессе: строка в базе без сигналов этого
+        # процесса и сдвиг общей версии.
+        Genre.objects.bulk_create([Genre(name='Вестерн', slug='western')])
+        bump_version(CATALOG)
+        assert client.get(url).json()['count'] == len(genres) + 1, (
+            'Проверьте, что кэш ответов сбрасывается версией, записанной '
+            'другим процессом.'
+        )
@@ -3,7 +3,8 @@ from http import HTTPStatus
 import pytest
 
 from tests.utils import (check_pagination, check_permissions,
-                         create_categories, create_genre, create_titles)
+                         create_categories, create_genre,
+                         create_single_review, create_titles)
 
 
 @pytest.mark.django_db(transaction=True)
@@ -316,3 +317,98 @@ class Test04TitleAPI:
                           HTTPStatus.FORBIDDEN)
         check_permissions(moderator_client, url, data, 'модератора',
                           titles, HTTPStatus.FORBIDDEN)
+
+    def test_06_titles_browsable_api(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        for url in (
+            '/api/v1/titles/',
+            '/api/v1/titles/?cursor=',
+            f'/api/v1/titles/{titles[0]["id"]}/',
+        ):
+            response = client.get(url, HTTP_ACCEPT='text/html')
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{url}` в браузерном API '
+                'возвращает ответ со статусом 200.'
+            )
+
+    def test_07_cached_links_follow_host(self, admin_client, client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/?limit=1'
+        links = {}
+        for host in ('first.example', 'second.example'):
+            response = client.get(url, HTTP_HOST=host)
+            links[host] = response.json()['next']
+        assert links['second.example'].startswith('http://second.example/'), (
+            f'Проверьте, что кэш ответов `{url}` не отдаёт ссылки '
+            'пагинации с чужим хостом.'
+        )
+
+    def test_08_title_filters(self, admin_client, client,
+                              user_client,
+                              django_assert_num_queries):
+        titles, categories, genres = create_titles(admin_client)
+        create_single_review(admin_client, titles[0]['id'], 'a', 7)
+        create_single_review(user_client, titles[0]['id'], 'b', 8)
+        first, second = titles[0]['id'], titles[1]['id']
+        both_genres = f'{genres[0]["slug"]},{genres[2]["slug"]}'
+        cases = (
+            (f'genre={both_genres}', {first, second}),
+            (f'genre={both_genres}&genre_mode=all', set()),
+            (f'genre={genres[0]["slug"]},{genres[1]["slug"]}'
+             '&genre_mode=all', {first}),
+            ('year_min=1985', {second}),
+            ('year_min=1980&year_max=1985', {first}),
+            ('rating_min=7.5', {first}),
+            ('rating_min=7.6', set()),
+            ('rating_max=7.5', {first}),
+            ('rating_max=7.4', set()),
+            (f'category__in={categories[0]["slug"]},{categories[1]["slug"]}',
+             {first, second}),
+            (f'category__in={categories[1]["slug"]}&year_max=1990', {second}),
+        )
+        for query, expected in cases:
+            url = f'/api/v1/titles/?{query}'
+            # Версии кэша, COUNT, произведения с категориями, жанры -
+            # фильтры не добавляют отдельных запросов.
+            with django_assert_num_queries(4 if expected else 2):
+                response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert {
+                title['id'] for title in response.json()['results']
+            } == expected, (
+                f'Проверьте фильтрацию произведений в GET-запросе к `{url}`.'
+            )
+
+    def test_09_title_facets(self, admin_client, user_client,
+                             django_assert_num_queries):
+        titles, categories, genres = create_titles(admin_client)
+        url = '/api/v1/titles/?facets=genre,category,year'
+        # Пользователь из токена, версии кэша, COUNT, произведения,
+        # жанры и по запросу на каждый фасет.
+        with django_assert_num_queries(8):
+            response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['facets'] == {
+            'genre': {genres[0]['slug']: 1, genres[1]['slug']: 1,
+                      genres[2]['slug']: 1},
+            'category': {categories[0]['slug']: 1, categories[1]['slug']: 1},
+            'year': {'1984': 1, '1988': 1},
+        }, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает счётчики фасетов.'
+        )
+
+        url = f'/api/v1/titles/?facets=genre&genre={genres[2]["slug"]}'
+        facets = user_client.get(url).json()['facets']
+        assert facets == {'genre': {genres[2]['slug']: 1}}, (
+            'Проверьте, что фасеты считаются для текущего набора фильтров.'
+        )
+        # Другая страница с теми же фильтрами - счётчики из кэша,
+        # пользователь - из кэша аутентификации.
+        with django_assert_num_queries(4):
+            user_client.get(f'{url}&limit=1&offset=0')
+
+        response = user_client.get('/api/v1/titles/?facets=author')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестный фасет возвращает ответ со статусом '
+            '400.'
+        )
@@ -1,8 +1,12 @@
 from http import HTTPStatus
 
 import pytest
+from django.db import transaction
 from django.db.utils import IntegrityError
 
+from api.cache import CATALOG, get_versions
+from api.serializers import ReviewSerializer
+from reviews.models import Genre, Title
 from tests.utils import (check_fields, check_pagination, create_reviews,
                          create_single_review, create_titles)
 
@@ -384,3 +388,129 @@ class Test05ReviewAPI:
                 f'Проверьте, что DELETE-запрос {role} к чужому отзыву через '
                 f'`{url_template}` удаляет отзыв.'
             )
+
+    def test_06_review_detail_browsable_api(self, client, admin_client,
+                                            admin):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        response = client.get(url, HTTP_ACCEPT='text/html')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` в браузерном API '
+            'возвращает ответ со статусом 200.'
+        )
+
+    def test_07_reviews_cursor_pagination(self, admin_client, admin,
+                                          user_client, user, client,
+                                          django_assert_max_num_queries):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/?cursor='
+        with django_assert_max_num_queries(10) as context:
+            response = client.get(url)
+        data = response.json()
+        assert not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        ), (
+            f'Проверьте, что GET-запрос к `{url}` не считает COUNT(*).'
+        )
+        assert 'count' not in data and data['next'] is None, (
+            f'Проверьте, что GET-запрос к `{url}` использует курсорную '
+            'пагинацию.'
+        )
+        assert [review['id'] for review in data['results']] == [
+            review['id'] for review in reversed(reviews)
+        ], (
+            f'Проверьте, что GET-запрос к `{url}` возвращает отзывы '
+            'от новых к старым.'
+        )
+
+    def test_08_reviews_conditional_get(self, admin_client, admin, client,
+                                        user_client, user,
+                                        django_assert_num_queries):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(url)
+        etag = response.get('ETag')
+        assert etag and response.get('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки `ETag` и `Last-Modified`.'
+        )
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+
+        create_single_review(user_client, titles[0]['id'], 'new', 7)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после добавления отзыва GET-запрос к `{url}` '
+            'со старым `If-None-Match` возвращает ответ со статусом 200.'
+        )
+
+    def test_09_duplicate_review_by_constraint(self, admin_client, client,
+                                               user_client,
+                                               django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        # Пользователь из токена, произведение, BEGIN, вставка отзыва,
+        # обновление рейтинга - без отдельной проверки на дубликат,
+        # и версии кэша отзывов и каталога после фиксации.
+        with django_assert_num_queries(7):
+            response = user_client.post(url, data={'text': 'a', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+
+        response = user_client.post(url, data={'text': 'b', 'score': 6})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что повторный отзыв на произведение возвращает '
+            'ответ со статусом 400.'
+        )
+        assert response.json() == {'non_field_errors': [
+            'На каждое произведение можно опубликовать только один отзыв.'
+        ]}
+        assert client.get(url).json()['count'] == 1
+
+    def test_10_cache_versions_bumped_on_commit(self, admin_client, admin,
+                                                client, user):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        client.post('/api/v1/auth/signup/', data={
+            'username': 'newcomer', 'email': 'newcomer@yamdb.fake'
+        })
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что регистрация пользователя не сбрасывает кэш '
+            'отзывов и комментариев.'
+        )
+
+        before = get_versions([CATALOG])
+        with transaction.atomic():
+            Genre.objects.create(name='Нуар', slug='noir')
+            assert get_versions([CATALOG]) == before, (
+                'Проверьте, что версия кэша сдвигается только после '
+                'фиксации транзакции.'
+            )
+        assert get_versions([CATALOG])[0][0] == before[0][0] + 1
+
+        admin_client.patch(
+            f'/api/v1/users/{admin.username}/', data={'username': 'boss'}
+        )
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что смена username сбрасывает кэш отзывов, '
+            'даже если запись пришлась на ту же секунду.'
+        )
+
+    def test_11_review_integrity_error_not_masked(self, admin_client, user):
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        Title.objects.filter(pk=title.pk).delete()
+        serializer = ReviewSerializer(data={'text': 'a', 'score': 5})
+        assert serializer.is_valid()
+        with pytest.raises(IntegrityError):
+            serializer.save(author=user, title=title)
@@ -0,0 +1,129 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Leaderboard, Review, Title, User
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def get_rating(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json().get('rating')
+
+    def test_01_rating_follows_reviews(self, admin_client, user_client,
+                                       moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'review', 3)
+        response = create_single_review(user_client, title_id, 'review', 8)
+        review_id = response.json()['id']
+        assert self.get_rating(admin_client, title_id) == 5.5, (
+            'Проверьте, что после добавления отзыва рейтинг произведения '
+            'равен средней оценке отзывов.'
+        )
+
+        url = f'/api/v1/titles/{title_id}/reviews/{review_id}/'
+        response = user_client.patch(url, data={'score': 10})
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(admin_client, title_id) == 6.5, (
+            'Проверьте, что после изменения оценки отзыва пересчитывается '
+            'рейтинг произведения.'
+        )
+
+        response = moderator_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(admin_client, title_id) == 3, (
+            'Проверьте, что после удаления отзыва пересчитывается '
+            'рейтинг произведения.'
+        )
+        assert self.get_rating(admin_client, titles[1]['id']) is None
+
+    def test_02_rebuild_ratings_command(self, admin_client, user_client,
+                                        client, moderator):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'review', 2)
+        create_single_review(user_client, title_id, 'review', 7)
+        Title.objects.update(rating_sum=0, rating_count=0)
+        url = f'/api/v1/titles/{title_id}/'
+        etag = client.get(url)['ETag']
+        reviews_url = f'{url}reviews/'
+        reviews_etag = client.get(reviews_url)['ETag']
+        Review.objects.bulk_create([Review(
+            title_id=title_id, author=moderator, text='review', score=3
+        )])
+
+        call_command('rebuild_ratings')
+
+        title = Title.objects.get(id=title_id)
+        assert (title.rating_sum, title.rating_count) == (12, 3), (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает рейтинг '
+            'по сохранённым отзывам.'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['rating'] == 4, (
+            'Проверьте, что команда `rebuild_ratings` сбрасывает кэш '
+            'ответов.'
+        )
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag)
+        assert len(response.json()['results']) == 3, (
+            'Проверьте, что после массовой записи сбрасывается кэш отзывов.'
+        )
+
+    def test_03_leaderboards(self, admin_client, client,
+                             django_assert_num_queries):
+        titles, _, genres = create_titles(admin_client)
+        single, popular = titles[0]['id'], titles[1]['id']
+        weak = Title.objects.create(name='Провал', year=2000)
+        users = [
+            User.objects.create(username=f'fan{idx}', email=f'{idx}@fan.fake')
+            for idx in range(5)
+        ]
+        Review.objects.create(
+            title_id=single, author=users[0], text='review', score=10
+        )
+        for user in users:
+            Review.objects.create(
+                title_id=popular, author=user, text='review', score=9
+            )
+            Review.objects.create(
+                title=weak, author=user, text='review', score=1
+            )
+
+        url = '/api/v1/leaderboards/top/'
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE, (
+            f'Проверьте, что `{url}` не строит рейтинги в запросе, '
+            'пока команда rebuild_leaderboards их не построила.'
+        )
+        assert not Leaderboard.objects.exists()
+
+        call_command('rebuild_leaderboards')
+        # Снимок рейтинга, произведения из него и их жанры.
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        ranking = [title['id'] for title in response.json()]
+        assert ranking == [popular, single, weak.id], (
+            f'Проверьте, что `{url}` использует байесовскую оценку и '
+            'произведение с одной десяткой не обгоняет пять девяток.'
+        )
+
+        response = client.get(f'{url}?genre={genres[2]["slug"]}&limit=10')
+        assert [title['id'] for title in response.json()] == [popular]
+
+        response = client.get('/api/v1/leaderboards/trending/')
+        assert [title['id'] for title in response.json()][:2] == [
+            popular, weak.id
+        ], (
+            'Проверьте, что популярные за неделю произведения упорядочены '
+            'по числу свежих отзывов.'
+        )
+        response = client.get('/api/v1/leaderboards/unknown/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
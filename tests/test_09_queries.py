@@ -0,0 +1,61 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_comments, create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    def test_01_titles_list_query_count(self, admin_client, client,
+                                        django_assert_num_queries):
+        create_titles(admin_client)
+        # Версии кэша, COUNT для пагинации, произведения с категориями,
+        # жанры.
+        for limit in (1, 10):
+            with django_assert_num_queries(4):
+                client.get(f'/api/v1/titles/?limit={limit}')
+
+    def test_02_title_detail_query_count(self, admin_client, client,
+                                         django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        with django_assert_num_queries(3):
+            client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+
+    def test_03_comment_create_resolves_review_once(
+            self, admin_client, admin, user_client, user,
+            django_assert_num_queries):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = (f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+               f'{reviews[0]["id"]}/comments/')
+        response = user_client.post(url, data={'text': 'comment'})
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что нельзя оставить комментарий к отзыву через URL '
+            'чужого произведения.'
+        )
+
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+               f'{reviews[0]["id"]}/comments/')
+        # Пользователь из токена уже в кэше аутентификации после первого
+        # запроса: отзыв вместе с проверкой произведения, вставка
+        # и версия кэша комментариев после фиксации.
+        with django_assert_num_queries(3):
+            response = user_client.post(url, data={'text': 'comment'})
+        assert response.status_code == HTTPStatus.CREATED
+
+    def test_04_explain_querysets_gate(self, admin_client, admin, user,
+                                       user_client):
+        create_comments(admin_client, {admin: admin_client, user: user_client})
+        out = StringIO()
+        call_command('explain_querysets', '--fail-on-scan', stdout=out)
+        flagged = [
+            line for line in out.getvalue().splitlines()
+            if line.startswith('SCAN')
+        ]
+        assert not flagged, (
+            'Проверьте, что `explain_querysets --fail-on-scan` не отмечает '
+            'ожидаемые просмотры списков и поиск по ключу.'
+        )
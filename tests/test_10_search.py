@@ -0,0 +1,170 @@
+import pytest
+
+from api import autocomplete
+from api.autocomplete import PrefixIndex, prefix_index
+from api.filters import TitleSearchFilter
+from api.cache import CATALOG, bump_version
+from reviews.models import Genre, Title
+from reviews.search import InvertedIndex
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleSearch:
+
+    def test_01_search_ranked(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/?search=орешек'
+        response = client.get(url)
+        names = [title['name'] for title in response.json()['results']]
+        assert names == [titles[1]['name']], (
+            f'Проверьте, что GET-запрос к `{url}` находит произведения '
+            'по словам из названия.'
+        )
+
+        response = client.get('/api/v1/titles/?search=BACK')
+        names = [title['name'] for title in response.json()['results']]
+        assert names == [titles[0]['name']], (
+            'Проверьте, что поиск без учёта регистра находит произведения '
+            'по словам из описания.'
+        )
+
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            data={'description': 'Орешек знаний твёрд'}
+        )
+        response = client.get(url)
+        names = [title['name'] for title in response.json()['results']]
+        assert names == [titles[1]['name'], titles[0]['name']], (
+            'Проверьте, что индекс обновляется при изменении произведения '
+            'и совпадение в названии ранжируется выше.'
+        )
+
+    def test_02_python_index(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        index = InvertedIndex()
+        assert index.search('орешек', 10) == [titles[1]['id']]
+
+        title = Title.objects.get(id=titles[0]['id'])
+        title.name = 'Крепкий орешек 2'
+        index.update(title)
+        assert set(index.search('крепкий орешек', 10)) == {
+            titles[0]['id'], titles[1]['id']
+        }
+        index.remove(titles[1]['id'])
+        assert index.search('орешек', 10) == [titles[0]['id']]
+        assert index.search('орешек терминатор', 10) == []
+
+    def test_03_autocomplete(self, admin_client, client,
+                             django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/autocomplete/'
+        response = client.get(url, {'q': 'ОРЕ'})
+        assert response.json() == [
+            {'type': 'title', 'name': titles[1]['name'],
+             'id': titles[1]['id']}
+        ], (
+            f'Проверьте, что GET-запрос к `{url}` находит произведения '
+            'по началу любого слова в названии.'
+        )
+
+        with django_assert_num_queries(0):
+            response = client.get(url, {'q': 'ко', 'type': 'genre'})
+        assert response.json() == [
+            {'type': 'genre', 'name': 'Комедия', 'slug': 'comedy'}
+        ]
+
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Космоопера', 'slug': 'space'}
+        )
+        response = client.get(url, {'q': 'ко', 'type': 'genre'})
+        assert [item['slug'] for item in response.json()] == [
+            'comedy', 'space'
+        ], (
+            'Проверьте, что автодополнение обновляется при изменении жанров.'
+        )
+
+    def test_04_search_keeps_rank_with_cursor(self, admin_client, client,
+                                              monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            data={'description': 'Орешек знаний твёрд'}
+        )
+        url = '/api/v1/titles/?search=орешек&cursor='
+        response = client.get(url)
+        names = [title['name'] for title in response.json()['results']]
+        assert names == [titles[1]['name'], titles[0]['name']], (
+            f'Проверьте, что GET-запрос к `{url}` сохраняет порядок '
+            'по релевантности.'
+        )
+        assert 'search_limit' not in response.json()
+
+        monkeypatch.setattr(TitleSearchFilter, 'max_results', 1)
+        response = client.get('/api/v1/titles/?search=орешек&limit=5')
+        data = response.json()
+        assert data['count'] == 1 and data['search_limit'] == 1, (
+            'Проверьте, что ответ сообщает об ограничении числа '
+            'результатов поиска.'
+        )
+
+    def test_05_prefix_index_updates_in_place(self, admin_client, client,
+                                              monkeypatch,
+                                              django_assert_num_queries):
+        create_titles(admin_client)
+        url = '/api/v1/autocomplete/'
+        client.get(url, {'q': 'ко', 'type': 'genre'})
+        assert set(prefix_index.entries) == {'genre'}, (
+            'Проверьте, что автодополнение по одному виду не строит '
+            'и не просматривает ключи остальных.'
+        )
+
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Космоопера', 'slug': 'space'}
+        )
+        with django_assert_num_queries(0):
+            response = client.get(url, {'q': 'кос', 'type': 'genre'})
+        assert [item['slug'] for item in response.json()] == ['space'], (
+            'Проверьте, что новый жанр попадает в индекс без перестройки.'
+        )
+        admin_client.delete('/api/v1/genres/space/')
+        with django_assert_num_queries(0):
+            response = client.get(url, {'q': 'кос', 'type': 'genre'})
+        assert response.json() == []
+
+        index = PrefixIndex()
+        make_entries = autocomplete.make_entries
+
+        def racing_make_entries(name, key):
+            # Запись пришла, пока сборка читает базу.
+            index.update('genre', 0)
+            return make_entries(name, key)
+
+        monkeypatch.setattr(autocomplete, 'make_entries', racing_make_entries)
+        index.build('genre')
+        assert 'genre' not in index.entries, (
+            'Проверьте, что сборка, во время которой индекс изменился, '
+            'не сохраняется.'
+        )
+
+    def test_06_indexes_follow_other_processes(self, admin_client, client,
+                                               settings):
+        create_titles(admin_client)
+        settings.INDEX_REFRESH_INTERVAL = 0
+        url = '/api/v1/autocomplete/'
+        client.get(url, {'q': 'кос', 'type': 'genre'})
+        index = InvertedIndex()
+        assert index.search('космос', 10) == []
+
+        # Запись в другом процессе: строки без сигналов этого процесса
+        # и сдвиг общей версии.
+        Genre.objects.bulk_create([Genre(name='Космоопера', slug='space')])
+        Title.objects.bulk_create([Title(name='Космос', year=2000)])
+        bump_version(CATALOG)
+        response = client.get(url, {'q': 'кос', 'type': 'genre'})
+        assert [item['slug'] for item in response.json()] == ['space'], (
+            'Проверьте, что автодополнение видит записи других процессов.'
+        )
+        assert len(index.search('космос', 10)) == 1, (
+            'Проверьте, что поиск в памяти видит записи других процессов.'
+        )
@@ -0,0 +1,78 @@
+import json
+from collections import OrderedDict
+from datetime import datetime, timezone
+from decimal import Decimal
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONParser, FastJSONRenderer
+from tests.utils import create_single_review, create_titles
+
+
+class Test11Renderers:
+
+    data = OrderedDict(
+        count=2,
+        results=[
+            {
+                'name': 'Терминатор',
+                'rating': 7.5,
+                'score': Decimal('8.25'),
+                'pub_date': datetime(2023, 1, 2, 3, 4, 5, 678,
+                                     tzinfo=timezone.utc),
+                'message': gettext_lazy('Not found.'),
+            },
+            {'name': 'Крепкий орешек', 'rating': None, 'genre': []},
+        ]
+    )
+
+    def test_01_renderer_matches_drf(self):
+        assert FastJSONRenderer().render(self.data) == (
+            JSONRenderer().render(self.data)
+        ), (
+            'Проверьте, что FastJSONRenderer отдаёт те же байты, '
+            'что и JSONRenderer.'
+        )
+        assert FastJSONRenderer().render(None) == b''
+
+    def test_02_parser(self):
+        content = JSONRenderer().render(self.data)
+        assert FastJSONParser().parse(BytesIO(content)) == (
+            JSONParser().parse(BytesIO(content))
+        )
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(BytesIO(b'{"name": '))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_api_responses(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = user_client.post(
+            url, data={'text': 'json', 'score': 8}, format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что API принимает тело запроса в формате JSON.'
+        )
+        create_single_review(admin_client, titles[0]['id'], 'form', 7)
+        response = user_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.content == JSONRenderer().render(response.data)
+        assert response.json()['rating'] == 7.5
+
+    def test_04_renderer_edge_cases(self):
+        text = {'text': 'a\u2028b\u2029c'}
+        assert FastJSONRenderer().render(text) == (
+            JSONRenderer().render(text)
+        ), (
+            'Проверьте, что FastJSONRenderer экранирует U+2028 и U+2029, '
+            'как JSONRenderer.'
+        )
+        numbers = {'big': 1e16, 'small': 1e-7, 'rating': 7.25}
+        assert json.loads(FastJSONRenderer().render(numbers)) == json.loads(
+            JSONRenderer().render(numbers)
+        )
@@ -0,0 +1,89 @@
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from api.serializers import (CommentReadSerializer, CommentSerializer,
+                             ReviewReadSerializer, ReviewSerializer,
+                             TitleGetSerializer, TitleReadSerializer)
+from reviews.models import Comment, Review, Title
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ReadSerializers:
+
+    @pytest.mark.parametrize('model, serializer, read_serializer, related', (
+        (Title, TitleGetSerializer, TitleReadSerializer, 'category'),
+        (Review, ReviewSerializer, ReviewReadSerializer, 'author'),
+        (Comment, CommentSerializer, CommentReadSerializer, 'author'),
+    ))
+    def test_01_read_serializer_parity(self, admin_client, admin,
+                                       user_client, user, model, serializer,
+                                       read_serializer, related):
+        create_comments(admin_client, {admin: admin_client, user: user_client})
+        Title.objects.create(name='Без категории', year=2000)
+        queryset = model.objects.select_related(related).order_by('id')
+        if model is Title:
+            queryset = queryset.prefetch_related('genre')
+        expected = JSONRenderer().render(
+            serializer(queryset, many=True).data
+        )
+        assert JSONRenderer().render(
+            read_serializer(queryset, many=True).data
+        ) == expected, (
+            f'Проверьте, что {read_serializer.__name__} отдаёт те же байты, '
+            f'что и {serializer.__name__}.'
+        )
+
+    def test_02_reviews_list_single_query(self, admin_client, admin,
+                                          user_client, user, client,
+                                          django_assert_num_queries):
+        _, _, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/?cursor='
+        # Версии кэша, произведение из URL и отзывы вместе с авторами.
+        with django_assert_num_queries(3):
+            client.get(url)
+
+    def test_03_sparse_fields_trim_sql(self, admin_client, admin, user_client,
+                                       user, client,
+                                       django_assert_num_queries):
+        _, _, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = '/api/v1/titles/?fields=id,name,rating'
+        # Версии кэша, COUNT и произведения, без JOIN категорий
+        # и без запроса жанров.
+        with django_assert_num_queries(3) as context:
+            response = client.get(url)
+        assert set(response.json()['results'][0]) == {'id', 'name', 'rating'}
+        sql = context.captured_queries[-1]['sql']
+        assert 'description' not in sql and 'JOIN' not in sql, (
+            f'Проверьте, что GET-запрос к `{url}` не выбирает '
+            'ненужные столбцы и связи.'
+        )
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/?omit=description,genre'
+        response = client.get(url)
+        assert list(response.json()) == [
+            'id', 'name', 'year', 'rating', 'category'
+        ]
+        assert response.json()['category'] is not None
+
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+               '?cursor=&fields=author')
+        with django_assert_num_queries(3) as context:
+            response = client.get(url)
+        assert [set(review) for review in response.json()['results']] == [
+            {'author'}, {'author'}
+        ]
+        assert '"text"' not in context.captured_queries[-1]['sql']
+
+        response = admin_client.get('/api/v1/users/?fields=username,role')
+        assert set(response.json()['results'][0]) == {'username', 'role'}
+
+        response = client.get('/api/v1/titles/?fields=secret')
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестное поле в `fields` возвращает ответ '
+            'со статусом 400.'
+        )
@@ -0,0 +1,71 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from reviews import outbox
+from reviews.models import OutgoingMail
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13Outbox:
+
+    url_signup = '/api/v1/auth/signup/'
+
+    def test_01_signup_does_not_send_mail(self, client, settings):
+        settings.OUTBOX_MODE = 'command'
+        response = client.post(self.url_signup, data={
+            'username': 'queued', 'email': 'queued@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что регистрация только ставит письмо в очередь.'
+        )
+        assert OutgoingMail.objects.filter(sent_at__isnull=True).count() == 1
+
+        call_command('run_outbox')
+        assert [message.to for message in mail.outbox] == [
+            ['queued@yamdb.fake']
+        ], (
+            'Проверьте, что команда `run_outbox` отправляет письма из очереди.'
+        )
+        assert not OutgoingMail.objects.filter(sent_at__isnull=True).exists()
+
+    def test_02_failed_mail_is_retried(self, settings, monkeypatch):
+        settings.OUTBOX_MODE = 'command'
+
+        def fail(message):
+            raise ConnectionError('SMTP недоступен')
+
+        monkeypatch.setattr(outbox.EmailMessage, 'send', fail)
+        outbox.enqueue('Тема', 'текст', 'from@yamdb.fake',
+                       ['a@yamdb.fake', 'b@yamdb.fake'])
+        assert outbox.dispatch_pending() == 0
+        assert set(OutgoingMail.objects.values_list(
+            'attempts', 'last_error'
+        )) == {(1, 'SMTP недоступен')}
+        assert outbox.dispatch_pending() == 0, (
+            'Проверьте, что неудачное письмо откладывается до следующей '
+            'попытки.'
+        )
+
+        monkeypatch.undo()
+        OutgoingMail.objects.update(next_attempt=timezone.now())
+        assert outbox.dispatch_all() == 2
+        assert len(mail.outbox) == 2
+
+    def test_03_worker_starts_with_first_request(self, client, settings,
+                                                 monkeypatch):
+        started = []
+        monkeypatch.setattr(outbox.worker, 'start', lambda: started.append(1))
+        client.get('/api/v1/categories/')
+        assert started == []
+
+        settings.OUTBOX_MODE = 'thread'
+        client.get('/api/v1/categories/')
+        assert started, (
+            'Проверьте, что фоновый обработчик очереди запускается первым '
+            'запросом к процессу, а не только новой регистрацией.'
+        )
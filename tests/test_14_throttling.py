@@ -0,0 +1,131 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from api.throttling import SQLiteBucketStore, get_store
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14AuthThrottling:
+
+    url_signup = '/api/v1/auth/signup/'
+    url_token = '/api/v1/auth/token/'
+
+    def test_01_username_bucket(self, client, user):
+        data = {'username': user.username, 'confirmation_code': 'wrong'}
+        statuses = [
+            client.post(self.url_token, data=data).status_code
+            for _ in range(6)
+        ]
+        assert statuses == [HTTPStatus.BAD_REQUEST] * 5 + [
+            HTTPStatus.TOO_MANY_REQUESTS
+        ], (
+            f'Проверьте, что подбор кода к `{self.url_token}` для одного '
+            'username ограничен.'
+        )
+        response = client.post(self.url_token, data=data)
+        assert int(response['Retry-After']) > 0
+
+        response = client.post(self.url_signup, data={
+            'username': 'other', 'email': 'other@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что бакет одного username не мешает другим.'
+        )
+
+    def test_02_ip_bucket_and_metrics(self, client, settings):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {'auth_ip': '3/min'}
+        }
+        statuses = [
+            client.post(self.url_signup, data={
+                'username': f'spam{number}',
+                'email': f'spam{number}@yamdb.fake'
+            }).status_code
+            for number in range(4)
+        ]
+        assert statuses == [HTTPStatus.OK] * 3 + [
+            HTTPStatus.TOO_MANY_REQUESTS
+        ], (
+            f'Проверьте, что регистрация `{self.url_signup}` с одного IP '
+            'ограничена.'
+        )
+        response = client.post(
+            self.url_signup,
+            data={'username': 'spam9', 'email': 'spam9@yamdb.fake'},
+            REMOTE_ADDR='10.0.0.2'
+        )
+        assert response.status_code == HTTPStatus.OK
+
+        assert get_store().rejections()['auth_ip']['count'] == 1
+        call_command('throttle_stats', '--reset')
+        assert get_store().rejections() == {}
+
+    def test_03_store_shared_between_processes(self, settings):
+        first = SQLiteBucketStore(settings.THROTTLE_DB_PATH)
+        second = SQLiteBucketStore(settings.THROTTLE_DB_PATH)
+        assert first.consume('scope', 'key', 2, 0.001)[0]
+        assert second.consume('scope', 'key', 2, 0.001)[0]
+        allowed, wait = first.consume('scope', 'key', 2, 0.001)
+        assert not allowed and wait > 0, (
+            'Проверьте, что бакеты общие для всех подключений к файлу.'
+        )
+
+    def test_04_non_object_body(self, client):
+        response = client.post(
+            self.url_signup, data=[1], content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что POST-запрос к `{self.url_signup}` со списком '
+            'вместо объекта возвращает ответ со статусом 400.'
+        )
+
+    def test_05_full_buckets_pruned(self, settings):
+        store = SQLiteBucketStore(settings.THROTTLE_DB_PATH, prune_interval=0)
+        store.consume('scope', 'idle', 2, 1000)
+        time.sleep(0.01)
+        store.consume('scope', 'busy', 2, 0.001)
+        store.consume('scope', 'other', 2, 0.001)
+        keys = {
+            key for key, in store.connect().execute('SELECT key FROM buckets')
+        }
+        assert keys == {'scope:busy', 'scope:other'}, (
+            'Проверьте, что наполнившиеся бакеты удаляются из файла.'
+        )
+
+    def test_06_forwarded_for_needs_proxies(self, client, settings):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {'auth_ip': '3/min'}
+        }
+        statuses = [
+            client.post(
+                self.url_signup,
+                data={
+                    'username': f'spoof{number}',
+                    'email': f'spoof{number}@yamdb.fake'
+                },
+                HTTP_X_FORWARDED_FOR=f'10.1.0.{number}'
+            ).status_code
+            for number in range(4)
+        ]
+        assert statuses[-1] == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что без NUM_PROXIES заголовок X-Forwarded-For '
+            'не обходит ограничение по IP.'
+        )
+
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK, 'NUM_PROXIES': 1
+        }
+        response = client.post(
+            self.url_signup,
+            data={'username': 'proxied', 'email': 'proxied@yamdb.fake'},
+            HTTP_X_FORWARDED_FOR='10.1.0.9'
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что за настроенным прокси бакет выбирается '
+            'по X-Forwarded-For.'
+        )